@@ -109,8 +109,73 @@ class Column(object):
         o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
         return o == 0
 
+    # Column
+    def RunLengths(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 8))
+        return 0
+
+    # Column
+    def RunLengthsAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Int64Flags, o)
+        return 0
+
+    # Column
+    def RunLengthsLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Column
+    def RunLengthsIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        return o == 0
+
+    # Column
+    def Packed(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Uint8Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 1))
+        return 0
+
+    # Column
+    def PackedAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Uint8Flags, o)
+        return 0
+
+    # Column
+    def PackedLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Column
+    def PackedIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        return o == 0
+
+    # Column
+    def Index(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(16))
+        if o != 0:
+            x = self._tab.Indirect(o + self._tab.Pos)
+            from DataFrame.Index import Index
+            obj = Index()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
 def ColumnStart(builder):
-    builder.StartObject(4)
+    builder.StartObject(7)
 
 def Start(builder):
     ColumnStart(builder)
@@ -157,6 +222,36 @@ def ColumnStartStringvalVector(builder, numElems):
 def StartStringvalVector(builder, numElems):
     return ColumnStartStringvalVector(builder, numElems)
 
+def ColumnAddRunLengths(builder, runLengths):
+    builder.PrependUOffsetTRelativeSlot(4, flatbuffers.number_types.UOffsetTFlags.py_type(runLengths), 0)
+
+def AddRunLengths(builder, runLengths):
+    ColumnAddRunLengths(builder, runLengths)
+
+def ColumnStartRunLengthsVector(builder, numElems):
+    return builder.StartVector(8, numElems, 8)
+
+def StartRunLengthsVector(builder, numElems):
+    return ColumnStartRunLengthsVector(builder, numElems)
+
+def ColumnAddPacked(builder, packed):
+    builder.PrependUOffsetTRelativeSlot(5, flatbuffers.number_types.UOffsetTFlags.py_type(packed), 0)
+
+def AddPacked(builder, packed):
+    ColumnAddPacked(builder, packed)
+
+def ColumnStartPackedVector(builder, numElems):
+    return builder.StartVector(1, numElems, 1)
+
+def StartPackedVector(builder, numElems):
+    return ColumnStartPackedVector(builder, numElems)
+
+def ColumnAddIndex(builder, index):
+    builder.PrependUOffsetTRelativeSlot(6, flatbuffers.number_types.UOffsetTFlags.py_type(index), 0)
+
+def AddIndex(builder, index):
+    ColumnAddIndex(builder, index)
+
 def ColumnEnd(builder):
     return builder.EndObject()
 
@@ -56,8 +56,15 @@ class DataFrame(object):
         o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
         return o == 0
 
+    # DataFrame
+    def Version(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Uint64Flags, o + self._tab.Pos)
+        return 0
+
 def DataFrameStart(builder):
-    builder.StartObject(2)
+    builder.StartObject(3)
 
 def Start(builder):
     DataFrameStart(builder)
@@ -80,6 +87,12 @@ def DataFrameStartColumnsVector(builder, numElems):
 def StartColumnsVector(builder, numElems):
     return DataFrameStartColumnsVector(builder, numElems)
 
+def DataFrameAddVersion(builder, version):
+    builder.PrependUint64Slot(2, version, 0)
+
+def AddVersion(builder, version):
+    DataFrameAddVersion(builder, version)
+
 def DataFrameEnd(builder):
     return builder.EndObject()
 
@@ -0,0 +1,9 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: DataFrame
+
+class Encoding(object):
+    Plain = 0
+    RunLength = 1
+    Delta = 2
+    BitPacked = 3
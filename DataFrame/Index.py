@@ -0,0 +1,219 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: DataFrame
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class Index(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = Index()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsIndex(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # Index
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # Index
+    def Kind(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int8Flags, o + self._tab.Pos)
+        return 0
+
+    # Index
+    def Permutation(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 8))
+        return 0
+
+    # Index
+    def PermutationAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Int64Flags, o)
+        return 0
+
+    # Index
+    def PermutationLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Index
+    def PermutationIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        return o == 0
+
+    # Index
+    def SortedInt(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 8))
+        return 0
+
+    # Index
+    def SortedIntAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Int64Flags, o)
+        return 0
+
+    # Index
+    def SortedIntLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Index
+    def SortedIntIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        return o == 0
+
+    # Index
+    def SortedFloat(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Float64Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 8))
+        return 0
+
+    # Index
+    def SortedFloatAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Float64Flags, o)
+        return 0
+
+    # Index
+    def SortedFloatLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Index
+    def SortedFloatIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        return o == 0
+
+    # Index
+    def Buckets(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 8))
+        return 0
+
+    # Index
+    def BucketsAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Int64Flags, o)
+        return 0
+
+    # Index
+    def BucketsLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Index
+    def BucketsIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        return o == 0
+
+    # Index
+    def Stale(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            return bool(self._tab.Get(flatbuffers.number_types.BoolFlags, o + self._tab.Pos))
+        return False
+
+def IndexStart(builder):
+    builder.StartObject(6)
+
+def Start(builder):
+    IndexStart(builder)
+
+def IndexAddKind(builder, kind):
+    builder.PrependInt8Slot(0, kind, 0)
+
+def AddKind(builder, kind):
+    IndexAddKind(builder, kind)
+
+def IndexAddPermutation(builder, permutation):
+    builder.PrependUOffsetTRelativeSlot(1, flatbuffers.number_types.UOffsetTFlags.py_type(permutation), 0)
+
+def AddPermutation(builder, permutation):
+    IndexAddPermutation(builder, permutation)
+
+def IndexStartPermutationVector(builder, numElems):
+    return builder.StartVector(8, numElems, 8)
+
+def StartPermutationVector(builder, numElems):
+    return IndexStartPermutationVector(builder, numElems)
+
+def IndexAddSortedInt(builder, sortedInt):
+    builder.PrependUOffsetTRelativeSlot(2, flatbuffers.number_types.UOffsetTFlags.py_type(sortedInt), 0)
+
+def AddSortedInt(builder, sortedInt):
+    IndexAddSortedInt(builder, sortedInt)
+
+def IndexStartSortedIntVector(builder, numElems):
+    return builder.StartVector(8, numElems, 8)
+
+def StartSortedIntVector(builder, numElems):
+    return IndexStartSortedIntVector(builder, numElems)
+
+def IndexAddSortedFloat(builder, sortedFloat):
+    builder.PrependUOffsetTRelativeSlot(3, flatbuffers.number_types.UOffsetTFlags.py_type(sortedFloat), 0)
+
+def AddSortedFloat(builder, sortedFloat):
+    IndexAddSortedFloat(builder, sortedFloat)
+
+def IndexStartSortedFloatVector(builder, numElems):
+    return builder.StartVector(8, numElems, 8)
+
+def StartSortedFloatVector(builder, numElems):
+    return IndexStartSortedFloatVector(builder, numElems)
+
+def IndexAddBuckets(builder, buckets):
+    builder.PrependUOffsetTRelativeSlot(4, flatbuffers.number_types.UOffsetTFlags.py_type(buckets), 0)
+
+def AddBuckets(builder, buckets):
+    IndexAddBuckets(builder, buckets)
+
+def IndexStartBucketsVector(builder, numElems):
+    return builder.StartVector(8, numElems, 8)
+
+def StartBucketsVector(builder, numElems):
+    return IndexStartBucketsVector(builder, numElems)
+
+def IndexAddStale(builder, stale):
+    builder.PrependBoolSlot(5, stale, False)
+
+def AddStale(builder, stale):
+    IndexAddStale(builder, stale)
+
+def IndexEnd(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return IndexEnd(builder)
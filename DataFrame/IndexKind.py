@@ -0,0 +1,7 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: DataFrame
+
+class IndexKind(object):
+    Sorted = 0
+    Hash = 1
@@ -38,8 +38,93 @@ class Metadata(object):
             return self._tab.Get(flatbuffers.number_types.Int8Flags, o + self._tab.Pos)
         return 0
 
+    # Metadata
+    def Encoding(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int8Flags, o + self._tab.Pos)
+        return 0
+
+    # Metadata
+    def Length(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Metadata
+    def Base(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Metadata
+    def BitWidth(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Uint8Flags, o + self._tab.Pos)
+        return 0
+
+    # Metadata
+    def First(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(16))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Metadata
+    def Stats(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(18))
+        if o != 0:
+            x = self._tab.Indirect(o + self._tab.Pos)
+            from DataFrame.Stats import Stats
+            obj = Stats()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
+    # Metadata
+    def ChunkRows(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(20))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Metadata
+    def ChunkStats(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(22))
+        if o != 0:
+            x = self._tab.Vector(o)
+            x += flatbuffers.number_types.UOffsetTFlags.py_type(j) * 4
+            x = self._tab.Indirect(x)
+            from DataFrame.Stats import Stats
+            obj = Stats()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
+    # Metadata
+    def ChunkStatsLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(22))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Metadata
+    def ChunkStatsIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(22))
+        return o == 0
+
+    # Metadata
+    def StatsStale(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(24))
+        if o != 0:
+            return bool(self._tab.Get(flatbuffers.number_types.BoolFlags, o + self._tab.Pos))
+        return False
+
 def MetadataStart(builder):
-    builder.StartObject(2)
+    builder.StartObject(11)
 
 def Start(builder):
     MetadataStart(builder)
@@ -56,6 +141,66 @@ def MetadataAddDtype(builder, dtype):
 def AddDtype(builder, dtype):
     MetadataAddDtype(builder, dtype)
 
+def MetadataAddEncoding(builder, encoding):
+    builder.PrependInt8Slot(2, encoding, 0)
+
+def AddEncoding(builder, encoding):
+    MetadataAddEncoding(builder, encoding)
+
+def MetadataAddLength(builder, length):
+    builder.PrependInt64Slot(3, length, 0)
+
+def AddLength(builder, length):
+    MetadataAddLength(builder, length)
+
+def MetadataAddBase(builder, base):
+    builder.PrependInt64Slot(4, base, 0)
+
+def AddBase(builder, base):
+    MetadataAddBase(builder, base)
+
+def MetadataAddBitWidth(builder, bitWidth):
+    builder.PrependUint8Slot(5, bitWidth, 0)
+
+def AddBitWidth(builder, bitWidth):
+    MetadataAddBitWidth(builder, bitWidth)
+
+def MetadataAddFirst(builder, first):
+    builder.PrependInt64Slot(6, first, 0)
+
+def AddFirst(builder, first):
+    MetadataAddFirst(builder, first)
+
+def MetadataAddStats(builder, stats):
+    builder.PrependUOffsetTRelativeSlot(7, flatbuffers.number_types.UOffsetTFlags.py_type(stats), 0)
+
+def AddStats(builder, stats):
+    MetadataAddStats(builder, stats)
+
+def MetadataAddChunkRows(builder, chunkRows):
+    builder.PrependInt64Slot(8, chunkRows, 0)
+
+def AddChunkRows(builder, chunkRows):
+    MetadataAddChunkRows(builder, chunkRows)
+
+def MetadataAddChunkStats(builder, chunkStats):
+    builder.PrependUOffsetTRelativeSlot(9, flatbuffers.number_types.UOffsetTFlags.py_type(chunkStats), 0)
+
+def AddChunkStats(builder, chunkStats):
+    MetadataAddChunkStats(builder, chunkStats)
+
+def MetadataStartChunkStatsVector(builder, numElems):
+    return builder.StartVector(4, numElems, 4)
+
+def StartChunkStatsVector(builder, numElems):
+    return MetadataStartChunkStatsVector(builder, numElems)
+
+def MetadataAddStatsStale(builder, statsStale):
+    builder.PrependBoolSlot(10, statsStale, False)
+
+def AddStatsStale(builder, statsStale):
+    MetadataAddStatsStale(builder, statsStale)
+
 def MetadataEnd(builder):
     return builder.EndObject()
 
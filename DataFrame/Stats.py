@@ -0,0 +1,154 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: DataFrame
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class Stats(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = Stats()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsStats(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # Stats
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # Stats
+    def Count(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Stats
+    def NullCount(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Stats
+    def DistinctCount(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(8))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Stats
+    def MinInt(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(10))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Stats
+    def MaxInt(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(12))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Stats
+    def SumInt(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(14))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Int64Flags, o + self._tab.Pos)
+        return 0
+
+    # Stats
+    def MinFloat(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(16))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Float64Flags, o + self._tab.Pos)
+        return 0.0
+
+    # Stats
+    def MaxFloat(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(18))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Float64Flags, o + self._tab.Pos)
+        return 0.0
+
+    # Stats
+    def SumFloat(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(20))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Float64Flags, o + self._tab.Pos)
+        return 0.0
+
+def StatsStart(builder):
+    builder.StartObject(9)
+
+def Start(builder):
+    StatsStart(builder)
+
+def StatsAddCount(builder, count):
+    builder.PrependInt64Slot(0, count, 0)
+
+def AddCount(builder, count):
+    StatsAddCount(builder, count)
+
+def StatsAddNullCount(builder, nullCount):
+    builder.PrependInt64Slot(1, nullCount, 0)
+
+def AddNullCount(builder, nullCount):
+    StatsAddNullCount(builder, nullCount)
+
+def StatsAddDistinctCount(builder, distinctCount):
+    builder.PrependInt64Slot(2, distinctCount, 0)
+
+def AddDistinctCount(builder, distinctCount):
+    StatsAddDistinctCount(builder, distinctCount)
+
+def StatsAddMinInt(builder, minInt):
+    builder.PrependInt64Slot(3, minInt, 0)
+
+def AddMinInt(builder, minInt):
+    StatsAddMinInt(builder, minInt)
+
+def StatsAddMaxInt(builder, maxInt):
+    builder.PrependInt64Slot(4, maxInt, 0)
+
+def AddMaxInt(builder, maxInt):
+    StatsAddMaxInt(builder, maxInt)
+
+def StatsAddSumInt(builder, sumInt):
+    builder.PrependInt64Slot(5, sumInt, 0)
+
+def AddSumInt(builder, sumInt):
+    StatsAddSumInt(builder, sumInt)
+
+def StatsAddMinFloat(builder, minFloat):
+    builder.PrependFloat64Slot(6, minFloat, 0.0)
+
+def AddMinFloat(builder, minFloat):
+    StatsAddMinFloat(builder, minFloat)
+
+def StatsAddMaxFloat(builder, maxFloat):
+    builder.PrependFloat64Slot(7, maxFloat, 0.0)
+
+def AddMaxFloat(builder, maxFloat):
+    StatsAddMaxFloat(builder, maxFloat)
+
+def StatsAddSumFloat(builder, sumFloat):
+    builder.PrependFloat64Slot(8, sumFloat, 0.0)
+
+def AddSumFloat(builder, sumFloat):
+    StatsAddSumFloat(builder, sumFloat)
+
+def StatsEnd(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return StatsEnd(builder)
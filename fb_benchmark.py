@@ -0,0 +1,354 @@
+"""
+    Benchmarks the Flatbuffer dataframe path against dill, pickle protocol 5 and (if pyarrow is
+    installed) Arrow IPC.
+
+    For every frame shape in the sweep and every path, measures the latency of serialize, publish
+    (into shared memory), attach (until a guest can query), head, group-by and map over repeated
+    runs, and reports percentiles, throughput, serialized size and memory as JSON lines. Every
+    path of a frame shape runs in its own spawned process, so that its peak RSS isn't inflated by
+    the paths benchmarked before it.
+
+    Usage:
+        python fb_benchmark.py --rows 1000,100000 --int-cols 10,100 --repeat 5 --output bench.jsonl
+"""
+import argparse
+import dill
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import resource
+import string
+import sys
+import time
+import tracemalloc
+import uuid
+import numpy as np
+from multiprocessing import shared_memory
+from fb_dataframe import to_flatbuffer
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+try:
+    import pyarrow
+    import pyarrow.compute
+except ImportError:
+    pyarrow = None
+
+OPERATIONS = ('serialize', 'publish', 'attach', 'head', 'group_by', 'map')
+
+
+def generate_bench_df(rows: int, int_cols: int, float_cols: int, string_cols: int, string_len: int):
+    """
+        Generates a dataframe with generate_random_df and widens it with float_cols additional
+        float columns and string_cols additional string columns of string_len characters.
+
+        @param rows: number of rows.
+        @param int_cols: number of additional int columns.
+        @param float_cols: number of additional float columns.
+        @param string_cols: number of additional string columns.
+        @param string_len: length of the additional strings.
+    """
+    df = generate_random_df(rows, int_cols)
+    extra = dict()
+    for i in range(float_cols):
+        extra[f"float_col_{i}"] = [random.uniform(0, 10000) for _ in range(rows)]
+    for i in range(string_cols):
+        extra[f"string_col_{i}"] = [''.join(random.choices(string.ascii_uppercase, k=string_len)) for _ in range(rows)]
+    for name, values in extra.items():
+        df[name] = values
+    return df.copy()
+
+
+class _Segment:
+    """
+        A uniquely named shared memory segment holding serialized bytes, as the pickle-based
+        host/guest notebooks use.
+    """
+    def __init__(self, payload: bytes):
+        self.size = len(payload)
+        self.shm = shared_memory.SharedMemory(name=f"bench_{uuid.uuid4().hex[:12]}", create=True, size=max(self.size, 1))
+        self.shm.buf[:self.size] = payload
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+class _FbPath:
+    """
+        The Flatbuffer path: frames are published with FbSharedMemory and queried in place.
+    """
+    name = 'fb'
+
+    def __init__(self, df, catalog_dir: str):
+        self.df = df
+        self.catalog_dir = catalog_dir
+
+    def _fb_shm(self, segment: str) -> FbSharedMemory:
+        # Without the result cache, every timed head and group-by does the full work like the other paths.
+        return FbSharedMemory(name=segment, size=self.nbytes + 4, catalog_path=os.path.join(self.catalog_dir, segment + '.json'),
+                              cache_bytes=0)
+
+    def setup(self) -> None:
+        self.nbytes = len(to_flatbuffer(self.df))
+        self.segment = f"bench_{uuid.uuid4().hex[:12]}"
+        self.fb_shm = self._fb_shm(self.segment)
+        self.fb_shm.add_dataframe("df", self.df)
+
+    def teardown(self) -> None:
+        self.fb_shm.close()
+        os.remove(os.path.join(self.catalog_dir, self.segment + '.json'))
+
+    def serialize(self):
+        return to_flatbuffer(self.df)
+
+    def publish(self):
+        segment = f"bench_{uuid.uuid4().hex[:12]}"
+        fb_shm = self._fb_shm(segment)
+        start = time.perf_counter()
+        fb_shm.add_dataframe("df", self.df)
+        elapsed = time.perf_counter() - start
+        fb_shm.close()
+        os.remove(os.path.join(self.catalog_dir, segment + '.json'))
+        return elapsed
+
+    def attach(self):
+        FbSharedMemory.attach(self.segment).close()
+
+    def head(self):
+        return self.fb_shm.dataframe_head("df", 5)
+
+    def group_by(self):
+        return self.fb_shm.dataframe_group_by_sum("df", "int_col", "additional_col_0")
+
+    def map(self):
+        self.fb_shm.dataframe_map_numeric_column("df", "int_col", lambda x: x + 1)
+
+
+class _PicklePath:
+    """
+        The baseline path: the whole frame is serialized into shared memory and every guest
+        query deserializes it first.
+    """
+    def __init__(self, df, name: str, dumps, loads):
+        self.df = df
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def setup(self) -> None:
+        self.payload = self.dumps(self.df)
+        self.nbytes = len(self.payload)
+        self.segment = _Segment(self.payload)
+
+    def teardown(self) -> None:
+        self.segment.close()
+
+    def _load(self):
+        return self.loads(self.segment.shm.buf[:self.segment.size])
+
+    def _republish(self, payload: bytes) -> None:
+        self.segment.close()
+        self.segment = _Segment(payload)
+
+    def serialize(self):
+        return self.dumps(self.df)
+
+    def publish(self):
+        start = time.perf_counter()
+        segment = _Segment(self.dumps(self.df))
+        elapsed = time.perf_counter() - start
+        segment.close()
+        return elapsed
+
+    def attach(self):
+        shm = shared_memory.SharedMemory(name=self.segment.shm.name)
+        self.loads(shm.buf[:self.segment.size])
+        shm.close()
+
+    def head(self):
+        return self._load().head()
+
+    def group_by(self):
+        return self._load().groupby("int_col").agg({'additional_col_0': 'sum'})
+
+    def map(self):
+        df = self._load()
+        df["int_col"] = df["int_col"].apply(lambda x: x + 1)
+        self._republish(self.dumps(df))
+
+
+class _ArrowPath(_PicklePath):
+    """
+        Arrow IPC: the frame is written as an IPC stream and read back zero-copy, so queries only
+        convert the columns they touch.
+    """
+    def __init__(self, df):
+        super().__init__(df, 'arrow', self._dumps, self._loads)
+
+    @staticmethod
+    def _dumps(df) -> bytes:
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def _loads(buf):
+        return pyarrow.ipc.open_stream(pyarrow.py_buffer(buf)).read_all()
+
+    def head(self):
+        return self._load().slice(0, 5).to_pandas()
+
+    def group_by(self):
+        return self._load().group_by("int_col").aggregate([("additional_col_0", "sum")]).to_pandas()
+
+    def map(self):
+        table = self._load()
+        i = table.schema.get_field_index("int_col")
+        table = table.set_column(i, "int_col", pyarrow.compute.add(table.column(i), 1))
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        # The table still references the old segment, which can't be closed while it is alive.
+        del table
+        self._republish(sink.getvalue().to_pybytes())
+
+
+def _measure(func, repeat: int, warmup: int) -> tuple:
+    """
+        Runs func warmup + repeat times and returns (latencies of the timed runs in seconds, peak
+        bytes allocated by one extra traced run). func may return its own latency as a float to
+        exclude setup work from the measurement.
+    """
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        latencies.append(result if isinstance(result, float) else elapsed)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return latencies, peak
+
+
+def _max_rss_bytes() -> int:
+    """
+        Returns the peak resident set size of this process so far, in bytes.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _make_path(path_name: str, df, catalog_dir: str):
+    """
+        Returns the benchmark path named path_name for df, or None if it isn't available.
+    """
+    if(path_name == 'fb'):
+        return _FbPath(df, catalog_dir)
+    if(path_name == 'dill'):
+        return _PicklePath(df, 'dill', dill.dumps, dill.loads)
+    if(path_name == 'pickle5'):
+        return _PicklePath(df, 'pickle5', lambda x: pickle.dumps(x, protocol=5), pickle.loads)
+    if(path_name == 'arrow' and pyarrow is not None):
+        return _ArrowPath(df)
+    return None
+
+
+def _run_path(case: dict, df, path_name: str, repeat: int, warmup: int, operations: tuple, catalog_dir: str) -> list:
+    """
+        Benchmarks one path on df and returns one result dict per operation. Runs in a spawned
+        process of its own, whose peak RSS is reported as max_rss_bytes.
+    """
+    path = _make_path(path_name, df, catalog_dir)
+    if(path is None):
+        return []
+    results = []
+    path.setup()
+    try:
+        for op in operations:
+            latencies, peak = _measure(getattr(path, op), repeat, warmup)
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99]).tolist()
+            mean = float(np.mean(latencies))
+            results.append({
+                **case, 'path': path_name, 'op': op, 'repeat': repeat,
+                'mean_s': mean, 'p50_s': p50, 'p90_s': p90, 'p99_s': p99,
+                'min_s': min(latencies), 'max_s': max(latencies),
+                'rows_per_s': case['rows'] / mean if mean else None,
+                'bytes_per_s': path.nbytes / mean if mean else None,
+                'serialized_bytes': path.nbytes, 'peak_alloc_bytes': peak, 'max_rss_bytes': _max_rss_bytes(),
+            })
+    finally:
+        path.teardown()
+    return results
+
+
+def run_case(case: dict, repeat: int = 5, warmup: int = 1, paths: tuple = ('fb', 'dill', 'pickle5', 'arrow'),
+             operations: tuple = OPERATIONS, catalog_dir: str = '.') -> list:
+    """
+        Benchmarks one frame shape and returns one result dict per (path, operation). Each path
+        runs in a fresh spawned process on the same frame, so max_rss_bytes is the peak RSS of
+        benchmarking that path alone (including the frame and the imports).
+
+        @param case: keyword arguments of generate_bench_df.
+        @param repeat: number of timed runs per operation.
+        @param warmup: number of untimed runs per operation.
+        @param paths: paths to benchmark among 'fb', 'dill', 'pickle5' and 'arrow'.
+        @param operations: operations to benchmark, see OPERATIONS.
+        @param catalog_dir: directory for the FbSharedMemory catalog files of the fb path.
+    """
+    df = generate_bench_df(**case)
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for path_name in paths:
+        with ctx.Pool(1) as pool:
+            results += pool.apply(_run_path, (case, df, path_name, repeat, warmup, operations, catalog_dir))
+    return results
+
+
+def sweep(rows: list, int_cols: list, float_cols: list, string_cols: list, string_lens: list) -> list:
+    """
+        Returns the cartesian product of the sweep dimensions as generate_bench_df arguments.
+    """
+    return [{'rows': r, 'int_cols': i, 'float_cols': f, 'string_cols': s, 'string_len': l}
+            for r in rows for i in int_cols for f in float_cols for s in string_cols for l in string_lens]
+
+
+def _int_list(value: str) -> list:
+    return [int(v) for v in value.split(',')]
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Flatbuffer dataframe path against dill, pickle and Arrow.")
+    parser.add_argument('--rows', type=_int_list, default=[1000, 10000, 100000])
+    parser.add_argument('--int-cols', type=_int_list, default=[10, 100])
+    parser.add_argument('--float-cols', type=_int_list, default=[0, 10])
+    parser.add_argument('--string-cols', type=_int_list, default=[0])
+    parser.add_argument('--string-len', type=_int_list, default=[10])
+    parser.add_argument('--paths', default='fb,dill,pickle5,arrow')
+    parser.add_argument('--ops', default=','.join(OPERATIONS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', default=None, help="append JSON lines to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'a') if args.output else sys.stdout
+    try:
+        for case in sweep(args.rows, args.int_cols, args.float_cols, args.string_cols, args.string_len):
+            for result in run_case(case, args.repeat, args.warmup, tuple(args.paths.split(',')), tuple(args.ops.split(','))):
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+    finally:
+        if(out is not sys.stdout):
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
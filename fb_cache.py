@@ -0,0 +1,101 @@
+from collections import OrderedDict
+
+
+def _nbytes(result) -> int:
+    """
+        Returns the memory used by a query result: a pandas dataframe, or a dict of NumPy arrays,
+        lists or nested dicts as returned in raw mode.
+
+        @param result: the query result.
+    """
+    if(isinstance(result, dict)):
+        return sum(_nbytes(v) for v in result.values())
+    if(hasattr(result, 'memory_usage')):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    if(hasattr(result, 'nbytes')):
+        return int(result.nbytes)
+    return sum(len(v) if isinstance(v, str) else 8 for v in result) if isinstance(result, list) else 8
+
+
+def _copy(result):
+    """
+        Returns a copy of a query result that the caller can modify freely.
+
+        @param result: the query result.
+    """
+    if(isinstance(result, dict)):
+        return {k: _copy(v) for k, v in result.items()}
+    if(hasattr(result, 'copy')):
+        return result.copy()
+    return result
+
+
+class ResultCache:
+    """
+        Least-recently-used cache of query results, bounded by the total bytes of the cached
+        results. Keys start with the name of the dataframe queried, so that all results of a
+        dataframe can be dropped at once.
+    """
+    def __init__(self, max_bytes: int):
+        """
+            @param max_bytes: maximum total size of the cached results, 0 to disable caching.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        """
+            Returns a copy of the result cached under key, or None.
+
+            @param key: the query key; key[0] is the dataframe name.
+        """
+        entry = self.entries.get(key)
+        if(entry is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return _copy(entry[0])
+
+    def put(self, key: tuple, result) -> None:
+        """
+            Caches a copy of result under key, evicting the least recently used results until it
+            fits. Results larger than the whole cache are not cached.
+
+            @param key: the query key; key[0] is the dataframe name.
+            @param result: the query result, a pandas dataframe or a raw dict.
+        """
+        nbytes = _nbytes(result)
+        if(nbytes > self.max_bytes):
+            return
+        self._remove(key)
+        while(self.nbytes + nbytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+        self.entries[key] = (_copy(result), nbytes)
+        self.nbytes += nbytes
+
+    def invalidate(self, df_name: str) -> None:
+        """
+            Drops every result cached for the dataframe df_name.
+
+            @param df_name: name of the dataframe.
+        """
+        for key in [k for k in self.entries if k[0] == df_name]:
+            self._remove(key)
+
+    def _remove(self, key: tuple) -> None:
+        entry = self.entries.pop(key, None)
+        if(entry is not None):
+            self.nbytes -= entry[1]
+
+    def stats(self) -> dict:
+        """
+            Returns the number of cached results, their bytes, and the hit, miss and eviction counts.
+        """
+        return {'entries': len(self.entries), 'bytes': self.nbytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
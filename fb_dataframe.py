@@ -1,14 +1,335 @@
+from __future__ import annotations
+import fb_metrics
 import flatbuffers
-import pandas as pd
+import numpy as np
 import struct
-import time
 import types
 from flatbuffers import Builder
-from DataFrame import Column, DataFrame, Metadata, ValueType
+from typing import TYPE_CHECKING
+from DataFrame import Column, DataFrame, Encoding, Index, IndexKind, Metadata, Stats, ValueType
+from fb_encoding import ENCODINGS, bit_width, choose_encoding, decode_bitpack, decode_delta, decode_rle, \
+    encode_bitpack, encode_delta, encode_rle, pack_bits, to_codes, unpack_bits
+from fb_index import INDEXES, build_hash, build_sorted, hash_buckets
+from fb_stats import AGGREGATES, aggregate, chunk_stats, column_stats, combine_stats
+
+# pandas is only imported when a pandas result is requested, so that guests asking for raw
+# results don't pay for importing it.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# vtable offsets of the Stats fields and of the Metadata fields updated in place.
+_STATS_FIELDS = (('count', 4, '<q'), ('null_count', 6, '<q'), ('distinct_count', 8, '<q'),
+                 ('min_int', 10, '<q'), ('max_int', 12, '<q'), ('sum_int', 14, '<q'),
+                 ('min_float', 16, '<d'), ('max_float', 18, '<d'), ('sum_float', 20, '<d'))
+_METADATA_BASE = 12
+_METADATA_FIRST = 16
+_METADATA_STATS_STALE = 24
+_DATAFRAME_VERSION = 8
+# Version of a frame that was replaced by a newer copy elsewhere in the buffer.
+SUPERSEDED_VERSION = 2 ** 64 - 1
+# vtable offsets of the Index fields updated in place.
+_INDEX_PERMUTATION = 6
+_INDEX_SORTED_INT = 8
+_INDEX_SORTED_FLOAT = 10
+_INDEX_BUCKETS = 12
+_INDEX_STALE = 14
+
+class BitWidthOverflow(ValueError):
+    """
+        Raised when the mapped values of a bit-packed or delta column don't fit in its bit width.
+        The mapped values are kept in values, so that the column can be re-encoded without
+        mapping it again.
+    """
+    def __init__(self, message: str, values: np.ndarray):
+        super().__init__(message)
+        self.values = values
+
 
 # Your Flatbuffer imports here (i.e. the files generated from running ./flatc with your Flatbuffer definition)...
 
-def to_flatbuffer(df: pd.DataFrame) -> bytearray:
+def _column_encoding(encodings: dict, col_name: str, values: np.ndarray) -> int:
+    """
+        Returns the Encoding requested for an int column, resolving 'auto' to the smallest one.
+
+        @param encodings: mapping of column name to encoding name, or None.
+        @param col_name: name of the column.
+        @param values: int64 values of the column.
+    """
+    name = (encodings or {}).get(col_name, 'plain')
+    if(name == 'auto'):
+        return choose_encoding(values)
+    if(name not in ENCODINGS):
+        raise ValueError(f"Unknown encoding '{name}' for column '{col_name}', expected one of {sorted(ENCODINGS) + ['auto']}")
+    return ENCODINGS[name]
+
+
+def _stats_fields(stats: dict, value_type: int) -> dict:
+    """
+        Maps column statistics to the Stats table fields. Missing values are stored as 0; readers
+        tell them apart by the count and null_count.
+
+        @param stats: column statistics, see fb_stats.column_stats.
+        @param value_type: ValueType of the column.
+    """
+    kind = 'float' if value_type == ValueType.ValueType().Float else 'int'
+    fields = {'count': stats['count'], 'null_count': stats['null_count'], 'distinct_count': stats['distinct_count'] or 0}
+    for name in ('min', 'max', 'sum'):
+        fields[f'{name}_{kind}'] = stats[name] or 0
+    return fields
+
+
+def _build_stats(builder: Builder, stats: dict, value_type: int) -> int:
+    """
+        Serializes column statistics into a Stats table and returns its offset. Every field is
+        written so that the table can be updated in place.
+
+        @param builder: the flatbuffer builder.
+        @param stats: column statistics, see fb_stats.column_stats.
+        @param value_type: ValueType of the column.
+    """
+    fields = _stats_fields(stats, value_type)
+    builder.ForceDefaults(True)
+    Stats.Start(builder)
+    Stats.AddCount(builder, fields['count'])
+    Stats.AddNullCount(builder, fields['null_count'])
+    Stats.AddDistinctCount(builder, fields['distinct_count'])
+    Stats.AddMinInt(builder, fields.get('min_int', 0))
+    Stats.AddMaxInt(builder, fields.get('max_int', 0))
+    Stats.AddSumInt(builder, fields.get('sum_int', 0))
+    Stats.AddMinFloat(builder, fields.get('min_float', 0.0))
+    Stats.AddMaxFloat(builder, fields.get('max_float', 0.0))
+    Stats.AddSumFloat(builder, fields.get('sum_float', 0.0))
+    offset = Stats.End(builder)
+    builder.ForceDefaults(False)
+    return offset
+
+
+def _read_stats(table: Stats.Stats, value_type: int) -> dict:
+    """
+        Reads column statistics back from a Stats table.
+
+        @param table: the Stats table.
+        @param value_type: ValueType of the column.
+    """
+    stats = {'count': table.Count(), 'null_count': table.NullCount(), 'distinct_count': table.DistinctCount(),
+             'min': None, 'max': None, 'sum': None}
+    if(value_type == ValueType.ValueType().Int):
+        stats['sum'] = table.SumInt()
+        if(stats['count'] > stats['null_count']):
+            stats['min'], stats['max'] = table.MinInt(), table.MaxInt()
+    elif(value_type == ValueType.ValueType().Float):
+        stats['sum'] = table.SumFloat()
+        if(stats['count'] > stats['null_count']):
+            stats['min'], stats['max'] = table.MinFloat(), table.MaxFloat()
+    return stats
+
+
+def _write_stats(table: Stats.Stats, stats: dict, value_type: int) -> None:
+    """
+        Overwrites a Stats table in place.
+
+        @param table: the Stats table, over a writable buffer.
+        @param stats: column statistics, see fb_stats.column_stats.
+        @param value_type: ValueType of the column.
+    """
+    fields = _stats_fields(stats, value_type)
+    for name, vtable_offset, fmt in _STATS_FIELDS:
+        if(name in fields):
+            _set_scalar_field(table, vtable_offset, fmt, fields[name])
+
+
+def _build_metadata(builder: Builder, col_name: str, value_type: int, values, chunk_rows: int,
+                    encoding: int = Encoding.Encoding().Plain, base: int = 0, width: int = 0, first: int = 0) -> int:
+    """
+        Serializes the Metadata of a column and returns its offset. Statistics of the whole column
+        and of every chunk_rows rows are recorded unless chunk_rows is 0. Columns of at most
+        chunk_rows rows get no chunk statistics, which would repeat the column statistics. Scalars
+        are always written so that they can be updated in place later.
+
+        @param builder: the flatbuffer builder.
+        @param col_name: name of the column.
+        @param value_type: ValueType of the column.
+        @param values: values of the column, used for the statistics.
+        @param chunk_rows: rows per chunk for the chunk statistics, 0 to record no statistics.
+        @param encoding: Encoding of an int column, and its base, width and first value below.
+    """
+    stats = chunks = None
+    if(chunk_rows):
+        stats = _build_stats(builder, column_stats(values), value_type)
+        chunk_offsets = []
+        if(len(values) > chunk_rows):
+            chunk_offsets = [_build_stats(builder, c, value_type) for c in chunk_stats(values, chunk_rows)]
+        Metadata.StartChunkStatsVector(builder, len(chunk_offsets))
+        for offset in reversed(chunk_offsets):
+            builder.PrependUOffsetTRelative(offset)
+        chunks = builder.EndVector(len(chunk_offsets))
+    name = builder.CreateString(col_name)
+    builder.ForceDefaults(True)
+    Metadata.Start(builder)
+    Metadata.AddName(builder, name)
+    Metadata.AddDtype(builder, value_type)
+    if(encoding != Encoding.Encoding().Plain):
+        Metadata.AddEncoding(builder, encoding)
+        Metadata.AddLength(builder, len(values))
+        Metadata.AddBase(builder, base)
+        Metadata.AddBitWidth(builder, width)
+        Metadata.AddFirst(builder, first)
+    if(stats is not None):
+        Metadata.AddStats(builder, stats)
+        Metadata.AddChunkRows(builder, chunk_rows)
+        Metadata.AddChunkStats(builder, chunks)
+        Metadata.AddStatsStale(builder, False)
+    meta = Metadata.End(builder)
+    builder.ForceDefaults(False)
+    return meta
+
+
+def _build_index(builder: Builder, indexes: dict, col_name: str, values, plain: bool = True) -> int:
+    """
+        Serializes the Index requested for a column and returns its offset, or None if no index
+        was requested. A sorted index stores the permutation sorting the rows, unless the column
+        is already sorted, and the sorted values of numeric columns, unless the column is plain
+        and already sorted (lookups then search the column itself). A hash index stores the rows
+        grouped by bucket and the bucket boundaries. stale is always written so that it can be
+        set in place later.
+
+        @param builder: the flatbuffer builder.
+        @param indexes: mapping of column name to index name, or None.
+        @param col_name: name of the column.
+        @param values: NumPy array of int64 or float64 values, or list of strings.
+        @param plain: whether the column values are stored plainly.
+    """
+    name = (indexes or {}).get(col_name)
+    if(name is None):
+        return None
+    if(name not in INDEXES):
+        raise ValueError(f"Unknown index '{name}' for column '{col_name}', expected one of {sorted(INDEXES)}")
+    permutation = sorted_values = buckets = None
+    if(INDEXES[name] == IndexKind.IndexKind().Sorted):
+        permutation, sorted_values = build_sorted(values)
+        if(permutation is None and plain):
+            sorted_values = None
+    else:
+        permutation, buckets = build_hash(values)
+    permutation = None if permutation is None else builder.CreateNumpyVector(permutation.astype(np.int64))
+    buckets = None if buckets is None else builder.CreateNumpyVector(buckets.astype(np.int64))
+    if(sorted_values is not None):
+        sorted_values = builder.CreateNumpyVector(sorted_values)
+    Index.Start(builder)
+    Index.AddKind(builder, INDEXES[name])
+    if(permutation is not None):
+        Index.AddPermutation(builder, permutation)
+    if(sorted_values is not None):
+        if(values.dtype.kind == 'f'):
+            Index.AddSortedFloat(builder, sorted_values)
+        else:
+            Index.AddSortedInt(builder, sorted_values)
+    if(buckets is not None):
+        Index.AddBuckets(builder, buckets)
+    builder.ForceDefaults(True)
+    Index.AddStale(builder, False)
+    builder.ForceDefaults(False)
+    return Index.End(builder)
+
+
+def _build_encoded_int_column(builder: Builder, col_name: str, values: np.ndarray, encoding: int, chunk_rows: int,
+                              index: int = None) -> int:
+    """
+        Serializes an int column with a non-plain encoding and returns the offset of the Column.
+
+        @param builder: the flatbuffer builder.
+        @param col_name: name of the column.
+        @param values: int64 values of the column.
+        @param encoding: one of Encoding.Plain, RunLength, Delta or BitPacked.
+        @param chunk_rows: rows per chunk for the statistics, 0 to record no statistics.
+        @param index: offset of the column's Index, or None.
+    """
+    intval = run_lengths = packed = None
+    base = width = first = 0
+    if(encoding == Encoding.Encoding().RunLength):
+        run_values, lengths = encode_rle(values)
+        intval = builder.CreateNumpyVector(run_values)
+        run_lengths = builder.CreateNumpyVector(lengths)
+    elif(encoding == Encoding.Encoding().Delta):
+        first, base, width, bits = encode_delta(values)
+        packed = builder.CreateNumpyVector(bits)
+    elif(encoding == Encoding.Encoding().BitPacked):
+        base, width, bits = encode_bitpack(values)
+        packed = builder.CreateNumpyVector(bits)
+    meta = _build_metadata(builder, col_name, ValueType.ValueType().Int, values, chunk_rows, encoding, base, width, first)
+    Column.Start(builder)
+    Column.AddMetadata(builder, meta)
+    if(intval is not None):
+        Column.AddIntval(builder, intval)
+    if(run_lengths is not None):
+        Column.AddRunLengths(builder, run_lengths)
+    if(packed is not None):
+        Column.AddPacked(builder, packed)
+    if(index is not None):
+        Column.AddIndex(builder, index)
+    return Column.End(builder)
+
+
+def _int_values(col: Column.Column, rows: int = None) -> np.ndarray:
+    """
+        Decodes the first rows values (all values if rows is None) of an int column into an int64
+        array, whatever its encoding.
+
+        @param col: the int column.
+        @param rows: number of values to decode.
+    """
+    m = col.Metadata()
+    encoding = m.Encoding()
+    if(encoding == Encoding.Encoding().Plain):
+        if(col.IntvalLength() == 0):
+            return np.zeros(0, dtype=np.int64)
+        return col.IntvalAsNumpy()[:rows]
+    if(encoding == Encoding.Encoding().RunLength):
+        if(m.Length() == 0):
+            return np.zeros(0, dtype=np.int64)
+        return decode_rle(col.IntvalAsNumpy(), col.RunLengthsAsNumpy(), rows)
+    n = m.Length() if rows is None else min(rows, m.Length())
+    packed = col.PackedAsNumpy() if col.PackedLength() else np.zeros(0, dtype=np.uint8)
+    if(encoding == Encoding.Encoding().Delta):
+        return decode_delta(packed, m.First(), m.Base(), m.BitWidth(), n)
+    return decode_bitpack(packed, m.Base(), m.BitWidth(), n)
+
+
+def _group_sum(keys: np.ndarray, values: np.ndarray) -> tuple:
+    """
+        Sums values per distinct key. Returns (sorted distinct keys, sums).
+
+        @param keys: grouping values.
+        @param values: values to sum, aligned with keys.
+    """
+    groups, inverse = np.unique(keys, return_inverse=True)
+    sums = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(sums, inverse.ravel(), values)
+    return groups, sums
+
+
+def _find_columns(fb_df: DataFrame.DataFrame, *col_names: str) -> list:
+    """
+        Returns the columns with the given names (None for a missing name), scanning the column
+        metadata only once.
+
+        @param fb_df: the flatbuffer dataframe.
+        @param col_names: names of the columns to look up.
+    """
+    found = dict()
+    for i in range(fb_df.ColumnsLength()):
+        col = fb_df.Columns(i)
+        name = col.Metadata().Name().decode()
+        if(name in col_names and name not in found):
+            found[name] = col
+            if(len(found) == len(set(col_names))):
+                break
+    return [found.get(name) for name in col_names]
+
+
+@fb_metrics.instrumented()
+def to_flatbuffer(df: pd.DataFrame, encodings: dict = None, stats: bool = True, chunk_rows: int = 65536,
+                  version: int = 0, indexes: dict = None) -> bytearray:
     """
         Converts a DataFrame to a flatbuffer. Returns the bytearray of the flatbuffer.
 
@@ -22,7 +343,22 @@ def to_flatbuffer(df: pd.DataFrame) -> bytearray:
             functions, respectively (i.e., don't convert them to strings yourself - you will lose
             precision for floats).
 
+        Int columns are stored plainly unless encodings asks otherwise: 'rle' (run-length),
+        'delta' (bit-packed deltas), 'bitpack' (frame-of-reference bit-packing) or 'auto' (the
+        smallest of these and plain). Encodings requested for non-int columns are ignored.
+
+        Unless stats is False, each column's metadata also records its count, null count, distinct
+        count, min, max and sum, for the whole column and for every chunk_rows rows.
+
+        indexes optionally maps column names to a secondary index stored with the column:
+        'sorted' (point and range lookups) or 'hash' (point lookups), see fb_dataframe_lookup.
+
         @param df: the dataframe.
+        @param encodings: optional mapping of column name to encoding name.
+        @param stats: whether to record column statistics.
+        @param chunk_rows: rows per chunk for the chunk statistics.
+        @param version: initial version of the frame, bumped by every in-place modification.
+        @param indexes: optional mapping of column name to index name.
     """
     builder = Builder(1024)
     metadata_string = builder.CreateString("DataFrame Metadata")
@@ -42,53 +378,54 @@ def to_flatbuffer(df: pd.DataFrame) -> bytearray:
         v=df[c]
         vecs.append(v.tolist())
         vecs_dtype.append(d)
+    chunk_rows = chunk_rows if stats else 0
     columns = list()
     for dtype, metadata, vvec in reversed(list(zip(vecs_dtype ,metalist, vecs))):
         if(dtype == 'int64'):
+            int_values = np.asarray(vvec, dtype=np.int64)
+            encoding = _column_encoding(encodings, metadata[0], int_values)
+            index = _build_index(builder, indexes, metadata[0], int_values, encoding == Encoding.Encoding().Plain)
+            if(encoding != Encoding.Encoding().Plain):
+                columns.append(_build_encoded_int_column(builder, metadata[0], int_values, encoding, chunk_rows, index))
+                continue
             Column.StartIntvalVector(builder, len(vvec))
             for value in reversed(vvec):
                 builder.PrependInt64(value)
             values = builder.EndVector(len(vvec))
-            col_name = builder.CreateString(metadata[0])
-            value_type = metadata[1]
-            Metadata.Start(builder)
-            Metadata.AddName(builder, col_name)
-            Metadata.AddDtype(builder, value_type)
-            meta = Metadata.End(builder)
+            meta = _build_metadata(builder, metadata[0], metadata[1], int_values, chunk_rows)
             Column.Start(builder)            
             Column.AddMetadata(builder, meta)
             Column.AddIntval(builder, values)
+            if(index is not None):
+                Column.AddIndex(builder, index)
             columns.append(Column.End(builder))
         elif(dtype == 'float64'):
+            index = _build_index(builder, indexes, metadata[0], np.asarray(vvec, dtype=np.float64))
             Column.StartFloatvalVector(builder, len(vvec))
             for value in reversed(vvec):
                 builder.PrependFloat64(value)
             values = builder.EndVector(len(vvec))
-            col_name = builder.CreateString(metadata[0])
-            value_type = metadata[1]
-            Metadata.Start(builder)
-            Metadata.AddName(builder, col_name)
-            Metadata.AddDtype(builder, value_type)
-            meta = Metadata.End(builder)
+            meta = _build_metadata(builder, metadata[0], metadata[1], np.asarray(vvec, dtype=np.float64), chunk_rows)
             Column.Start(builder)            
             Column.AddMetadata(builder, meta)
             Column.AddFloatval(builder, values)
+            if(index is not None):
+                Column.AddIndex(builder, index)
             columns.append(Column.End(builder))
         elif(dtype == 'object'):
-            str_offsets = [builder.CreateString(str(value)) for value in vvec]
+            str_values = [str(value) for value in vvec]
+            index = _build_index(builder, indexes, metadata[0], str_values)
+            str_offsets = [builder.CreateString(value) for value in str_values]
             Column.StartStringvalVector(builder, len(vvec))
             for offset in reversed(str_offsets):
                 builder.PrependUOffsetTRelative(offset)
             values = builder.EndVector(len(vvec))
-            col_name = builder.CreateString(metadata[0])
-            value_type = metadata[1]
-            Metadata.Start(builder)
-            Metadata.AddName(builder, col_name)
-            Metadata.AddDtype(builder, value_type)
-            meta = Metadata.End(builder)
+            meta = _build_metadata(builder, metadata[0], metadata[1], str_values, chunk_rows)
             Column.Start(builder)            
             Column.AddMetadata(builder, meta)
             Column.AddStringval(builder, values)
+            if(index is not None):
+                Column.AddIndex(builder, index)
             columns.append(Column.End(builder))
     DataFrame.StartColumnsVector(builder, len(columns))
     for c in columns:
@@ -97,18 +434,29 @@ def to_flatbuffer(df: pd.DataFrame) -> bytearray:
     DataFrame.Start(builder)
     DataFrame.AddMetadata(builder, metadata_string)
     DataFrame.AddColumns(builder, columns_vector)
+    builder.ForceDefaults(True)
+    DataFrame.AddVersion(builder, version)
+    builder.ForceDefaults(False)
     df_data = DataFrame.End(builder)
     builder.Finish(df_data)
-    return builder.Output()
+    output = builder.Output()
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=len(df), columns=len(metalist), bytes=len(output), copies=1, copied_bytes=len(output))
+    return output
 
-def fb_dataframe_head(fb_bytes: bytes, rows: int = 5) -> pd.DataFrame:
+@fb_metrics.instrumented()
+def fb_dataframe_head(fb_bytes: bytes, rows: int = 5, raw: bool = False) -> pd.DataFrame:
     """
         Returns the first n rows of the Flatbuffer Dataframe as a Pandas Dataframe
         similar to df.head(). If there are less than n rows, return the entire Dataframe.
         Hint: don't forget the column names!
 
+        If raw is True, returns a dict mapping column names to NumPy arrays (lists for string
+        columns) instead, without importing pandas.
+
         @param fb_bytes: bytes of the Flatbuffer Dataframe.
         @param rows: number of rows to return.
+        @param raw: whether to return a dict of arrays.
     """
     buf=flatbuffers.Builder(0)
     buf.Bytes=fb_bytes
@@ -119,17 +467,9 @@ def fb_dataframe_head(fb_bytes: bytes, rows: int = 5) -> pd.DataFrame:
         m=col.Metadata()
         c=m.Name().decode()
         if(m.Dtype() == ValueType.ValueType().Int):
-            values = []
-            max_index = min(col.IntvalLength(), rows)
-            for j in range(max_index):
-                value = col.Intval(j)
-                values.append(value)
+            values = _int_values(col, rows)
         elif(m.Dtype() == ValueType.ValueType().Float):
-            values = []
-            max_index = min(col.FloatvalLength(), rows)
-            for j in range(max_index):
-                value = col.Floatval(j)
-                values.append(value)
+            values = col.FloatvalAsNumpy()[:rows] if col.FloatvalLength() else np.zeros(0, dtype=np.float64)
         elif(m.Dtype() == ValueType.ValueType().String):
             values = []
             max_index = min(col.StringvalLength(), rows)
@@ -137,56 +477,750 @@ def fb_dataframe_head(fb_bytes: bytes, rows: int = 5) -> pd.DataFrame:
                 value = col.Stringval(j).decode()
                 values.append(value)
         columns[c] = values
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=min((len(v) for v in columns.values()), default=0), columns=len(columns),
+                         bytes=sum(_values_nbytes(v) for v in columns.values()))
+    if(raw):
+        # Copy out of the flatbuffer, which may be a view of shared memory.
+        return {c: np.array(v) if isinstance(v, np.ndarray) else v for c, v in columns.items()}
+    import pandas as pd
     res=pd.DataFrame(columns)
     return res
 
 
-def fb_dataframe_group_by_sum(fb_bytes: bytes, grouping_col_name: str, sum_col_name: str) -> pd.DataFrame:
+@fb_metrics.instrumented()
+def fb_dataframe_group_by_sum(fb_bytes: bytes, grouping_col_name: str, sum_col_name: str, raw: bool = False) -> pd.DataFrame:
     """
         Applies GROUP BY SUM operation on the flatbuffer dataframe grouping by grouping_col_name
         and summing sum_col_name. Returns the aggregate result as a Pandas dataframe.
 
+        If raw is True, returns a dict mapping grouping_col_name to the sorted group keys and
+        sum_col_name to their sums, as NumPy arrays, without importing pandas.
+
         @param fb_bytes: bytes of the Flatbuffer Dataframe.
         @param grouping_col_name: column to group by.
         @param sum_col_name: column to sum.
+        @param raw: whether to return a dict of arrays.
     """
     buf=memoryview(fb_bytes)
     fb_df=DataFrame.DataFrame.GetRootAsDataFrame(buf, 0)
-    sums=dict()
-    grpidx = -1
-    colidx = -1
-    for i in range(fb_df.ColumnsLength()):
-        col=fb_df.Columns(i)
-        col_name=col.Metadata().Name().decode()
-        if(col_name==grouping_col_name):
-            grpidx=i
-        elif(col_name==sum_col_name):
-            colidx = i
-            if(grpidx != -1):
-                break
-    if(grpidx==-1 or colidx == -1):
+    col, s = _find_columns(fb_df, grouping_col_name, sum_col_name)
+    if(col is None or s is None):
         return
-    col=fb_df.Columns(grpidx)
-    s=fb_df.Columns(colidx)
-    for j in range(col.IntvalLength()):
-        val=col.Intval(j)
-        sum_value=s.Intval(j)
-        sums[val]=sums.get(val,0)+sum_value
-    grp=sorted(sums.items())
-    res=pd.DataFrame(grp, columns=[grouping_col_name, sum_col_name])
+    m=col.Metadata()
+    if(m.Encoding() == Encoding.Encoding().RunLength and m.Length() > 0):
+        # Sum each run of the grouping column first, then merge runs sharing a key.
+        starts=np.concatenate(([0], np.cumsum(col.RunLengthsAsNumpy())[:-1]))
+        groups, sums = _group_sum(col.IntvalAsNumpy(), np.add.reduceat(_int_values(s), starts))
+    elif(m.Encoding() == Encoding.Encoding().BitPacked and 0 < (1 << m.BitWidth()) <= m.Length() * 4):
+        # Small code domain: aggregate directly on the codes and add the frame of reference back.
+        codes=unpack_bits(col.PackedAsNumpy(), m.BitWidth(), m.Length()).astype(np.intp)
+        sums=np.zeros(1 << m.BitWidth(), dtype=np.int64)
+        np.add.at(sums, codes, _int_values(s))
+        present=np.bincount(codes, minlength=len(sums)) > 0
+        groups=np.flatnonzero(present).astype(np.int64) + m.Base()
+        sums=sums[present]
+    else:
+        groups, sums = _group_sum(_int_values(col), _int_values(s))
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=_column_length(col), columns=2, bytes=_column_nbytes(col) + _column_nbytes(s))
+    if(raw):
+        return {grouping_col_name: groups, sum_col_name: sums}
+    import pandas as pd
+    res=pd.DataFrame({grouping_col_name: groups, sum_col_name: sums})
     res.set_index(grouping_col_name, inplace=True)
     return res
 
 
-def fb_dataframe_map_numeric_column(fb_buf: memoryview, col_name: str, map_func: types.FunctionType) -> None:
+def _column_length(col: Column.Column) -> int:
+    """
+        Returns the number of rows of a column, whatever its type and encoding.
+
+        @param col: the column.
+    """
+    m=col.Metadata()
+    if(m.Encoding() != Encoding.Encoding().Plain):
+        return m.Length()
+    if(m.Dtype() == ValueType.ValueType().Int):
+        return col.IntvalLength()
+    if(m.Dtype() == ValueType.ValueType().Float):
+        return col.FloatvalLength()
+    return col.StringvalLength()
+
+
+def _column_values(col: Column.Column, start: int = 0, stop: int = None):
+    """
+        Returns rows [start, stop) of a column as a NumPy array, or a list for string columns.
+
+        @param col: the column.
+        @param start: first row.
+        @param stop: row after the last one, None for the end of the column.
+    """
+    m=col.Metadata()
+    stop=_column_length(col) if stop is None else stop
+    if(m.Dtype() == ValueType.ValueType().Int):
+        values=_int_values(col, stop)[start:]
+    elif(m.Dtype() == ValueType.ValueType().Float):
+        values=col.FloatvalAsNumpy()[start:stop] if col.FloatvalLength() else np.zeros(0, dtype=np.float64)
+    else:
+        values=[col.Stringval(j).decode() for j in range(start, stop)]
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=len(values), bytes=_values_nbytes(values))
+    return values
+
+
+def _values_nbytes(values) -> int:
+    """
+        Returns the number of bytes held by decoded column values (UTF-8 length for strings).
+
+        @param values: NumPy array, or list of numbers or strings.
+    """
+    if(isinstance(values, np.ndarray)):
+        return values.nbytes
+    return sum(len(v) if isinstance(v, str) else 8 for v in values)
+
+
+def _column_nbytes(col: Column.Column) -> int:
+    """
+        Returns the number of bytes a column's value vectors occupy in the flatbuffer, counting
+        4-byte offsets for strings.
+
+        @param col: the column.
+    """
+    return 8 * (col.IntvalLength() + col.FloatvalLength() + col.RunLengthsLength()) + col.PackedLength() + \
+        4 * col.StringvalLength()
+
+
+def _scan_sum(col: Column.Column):
+    """
+        Sums a numeric column by scanning it, operating directly on encoded int columns where
+        possible.
+
+        @param col: the numeric column.
+    """
+    m=col.Metadata()
+    if(m.Dtype() == ValueType.ValueType().Float):
+        return float(np.nansum(_column_values(col)))
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=_column_length(col), bytes=_column_nbytes(col))
+    if(m.Encoding() == Encoding.Encoding().RunLength):
+        if(col.RunLengthsLength() == 0):
+            return 0
+        return int(np.dot(col.IntvalAsNumpy(), col.RunLengthsAsNumpy()))
+    if(m.Encoding() == Encoding.Encoding().BitPacked):
+        packed=col.PackedAsNumpy() if col.PackedLength() else np.zeros(0, dtype=np.uint8)
+        # Add the codes and the bases in uint64, which wraps around like the int64 sum of the plain path.
+        parts=np.array([unpack_bits(packed, m.BitWidth(), m.Length()).sum(), (m.Base() * m.Length()) % 2 ** 64], dtype=np.uint64)
+        return int(parts.sum().view(np.int64))
+    return int(_int_values(col).sum())
+
+
+def _column_aggregate(col: Column.Column, agg: str, start: int = 0, stop: int = None):
+    """
+        Computes an aggregate over rows [start, stop) of a column. Fresh statistics answer it
+        without touching the values: the column statistics for the whole column, otherwise the
+        chunk statistics for the chunks inside the range plus a scan of the partial chunks at
+        its edges. Stale or missing statistics fall back to a scan.
+
+        @param col: the column.
+        @param agg: one of fb_stats.AGGREGATES.
+        @param start: first row.
+        @param stop: row after the last one, None for the end of the column.
+    """
+    m=col.Metadata()
+    value_type=m.Dtype()
+    n=_column_length(col)
+    start=max(0, start)
+    stop=n if stop is None else min(stop, n)
+    fresh=m.Stats() is not None and not m.StatsStale()
+    if(start == 0 and stop == n):
+        if(fresh):
+            return aggregate(_read_stats(m.Stats(), value_type), agg)
+        if(agg == 'sum' and value_type != ValueType.ValueType().String):
+            return _scan_sum(col)
+    elif(fresh and agg != 'distinct_count' and m.ChunkStatsLength()):
+        chunk_rows=m.ChunkRows()
+        first_chunk=-(-start // chunk_rows)
+        last_chunk=stop // chunk_rows
+        if(first_chunk < last_chunk):
+            parts=[column_stats(_column_values(col, start, first_chunk * chunk_rows))]
+            parts+=[_read_stats(m.ChunkStats(i), value_type) for i in range(first_chunk, last_chunk)]
+            parts.append(column_stats(_column_values(col, last_chunk * chunk_rows, stop)))
+            return aggregate(combine_stats(parts), agg)
+    return aggregate(column_stats(_column_values(col, start, stop)), agg)
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_aggregate(fb_bytes: bytes, col_name: str, agg: str, start: int = 0, stop: int = None):
+    """
+        Returns an aggregate ('count', 'null_count', 'distinct_count', 'min', 'max', 'sum' or
+        'mean') over rows [start, stop) of a column in the flatbuffer dataframe, answered from the
+        precomputed statistics when they are fresh. min, max, sum and mean are None for string
+        columns. Returns None if col_name doesn't exist.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+        @param col_name: column to aggregate.
+        @param agg: the aggregate.
+        @param start: first row.
+        @param stop: row after the last one, None for the end of the column.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(fb_bytes), 0)
+    col=_find_columns(fb_df, col_name)[0]
+    if(col is None):
+        return None
+    fb_metrics.count(columns=1)
+    return _column_aggregate(col, agg, start, stop)
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_describe(fb_bytes: bytes, raw: bool = False) -> pd.DataFrame:
+    """
+        Returns summary statistics (count, null_count, distinct_count, min, max, sum and mean) of
+        every column in the flatbuffer dataframe, one column per dataframe column. Answered from
+        the precomputed statistics when they are fresh.
+
+        If raw is True, returns a dict mapping column names to dicts of statistics instead,
+        without importing pandas.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+        @param raw: whether to return a dict.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(fb_bytes), 0)
+    summary=dict()
+    fb_metrics.count(columns=fb_df.ColumnsLength())
+    for i in range(fb_df.ColumnsLength()):
+        col=fb_df.Columns(i)
+        summary[col.Metadata().Name().decode()]={agg: _column_aggregate(col, agg) for agg in AGGREGATES}
+    if(raw):
+        return summary
+    import pandas as pd
+    return pd.DataFrame(summary, index=list(AGGREGATES))
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_sum(fb_bytes: bytes, col_name: str):
+    """
+        Returns the sum of a numeric column in the flatbuffer dataframe, from its statistics when
+        they are fresh and otherwise operating directly on encoded int columns where possible.
+        Returns None if col_name doesn't exist or is a string column.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+        @param col_name: column to sum.
+    """
+    return fb_dataframe_aggregate(fb_bytes, col_name, 'sum')
+
+
+def _column_names(fb_df: DataFrame.DataFrame) -> list:
+    """
+        Returns the names of the columns of the flatbuffer dataframe, in order.
+
+        @param fb_df: the flatbuffer dataframe.
+    """
+    return [fb_df.Columns(i).Metadata().Name().decode() for i in range(fb_df.ColumnsLength())]
+
+
+def _take_values(col: Column.Column, rows: np.ndarray):
+    """
+        Returns the values of a column at the given rows as a NumPy array, or a list for string
+        columns, decoding only those strings.
+
+        @param col: the column.
+        @param rows: row indices, possibly repeated.
+    """
+    m=col.Metadata()
+    if(m.Dtype() == ValueType.ValueType().Int):
+        return _int_values(col)[rows]
+    if(m.Dtype() == ValueType.ValueType().Float):
+        return (col.FloatvalAsNumpy() if col.FloatvalLength() else np.zeros(0, dtype=np.float64))[rows]
+    return [col.Stringval(j).decode() for j in rows.tolist()]
+
+
+def _key_runs(sorted_keys: np.ndarray) -> tuple:
+    """
+        Returns (start, length) of every run of equal keys in sorted keys.
+
+        @param sorted_keys: keys in non-decreasing order.
+    """
+    if(not len(sorted_keys)):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    starts=np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    return starts, np.diff(np.append(starts, len(sorted_keys)))
+
+
+def _join_rows(build_keys: np.ndarray, probe_keys: np.ndarray, batch_rows: int) -> tuple:
+    """
+        Matches the probe keys against the build keys. Returns (build rows, probe rows) of every
+        matching pair, ordered by probe row and then build row.
+
+        The build keys are grouped into a table of distinct keys, each with the range of build
+        rows holding it, which the probe keys look up with np.searchsorted batch_rows at a time.
+
+        @param build_keys: keys of the smaller side.
+        @param probe_keys: keys of the larger side.
+        @param batch_rows: number of probe keys looked up at a time.
+    """
+    order=np.argsort(build_keys, kind='stable')
+    sorted_keys=build_keys[order]
+    starts, counts = _key_runs(sorted_keys)
+    distinct=sorted_keys[starts]
+    build_parts, probe_parts = [], []
+    for lo in range(0, len(probe_keys) if len(distinct) else 0, batch_rows):
+        batch=probe_keys[lo:lo+batch_rows]
+        pos=np.minimum(np.searchsorted(distinct, batch), len(distinct) - 1)
+        n=np.where(distinct[pos] == batch, counts[pos], 0)
+        ends=np.cumsum(n)
+        offsets=np.arange(ends[-1]) - np.repeat(ends - n, n)
+        build_parts.append(order[np.repeat(starts[pos], n) + offsets])
+        probe_parts.append(np.repeat(np.arange(lo, lo + len(batch)), n))
+    if(not build_parts):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return np.concatenate(build_parts), np.concatenate(probe_parts)
+
+
+def _merge_rows(left_keys: np.ndarray, right_keys: np.ndarray) -> tuple:
+    """
+        Matches two sorted key columns with a linear merge. Returns (left rows, right rows) of
+        every matching pair, ordered by left row and then right row.
+
+        Both sides are split into runs of equal keys. Merging the distinct keys of both sides
+        with a stable sort (timsort merges the two sorted runs in linear time) puts every key
+        found on both sides next to itself, left first.
+
+        @param left_keys: sorted keys of the left side.
+        @param right_keys: sorted keys of the right side.
+    """
+    left_starts, left_counts = _key_runs(left_keys)
+    right_starts, right_counts = _key_runs(right_keys)
+    merged=np.concatenate((left_keys[left_starts], right_keys[right_starts]))
+    order=np.argsort(merged, kind='stable')
+    same=np.flatnonzero(merged[order[1:]] == merged[order[:-1]])
+    li, ri = order[same], order[same + 1] - len(left_starts)
+    # Each matching key pairs every row of its left run with every row of its right run.
+    lc, rc = left_counts[li], right_counts[ri]
+    n=lc * rc
+    ends=np.cumsum(n)
+    match=np.repeat(np.arange(len(n)), n)
+    offsets=np.arange(ends[-1] if len(ends) else 0) - (ends - n)[match]
+    return left_starts[li][match] + offsets // rc[match], right_starts[ri][match] + offsets % rc[match]
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_join(left_bytes: bytes, right_bytes: bytes, left_on: str, right_on: str = None,
+                      left_columns: list = None, right_columns: list = None, method: str = 'hash',
+                      batch_rows: int = 65536, raw: bool = False) -> pd.DataFrame:
+    """
+        Inner joins two flatbuffer dataframes on left_on == right_on without materializing them:
+        the key columns are read in place (zero-copy for plain numeric columns) and only the
+        projected columns are gathered for the matching rows. Rows are ordered by left row and
+        then right row, and columns named like pandas.merge, with the suffixes '_x' and '_y' on
+        overlapping column names.
+        Returns None if a key or projected column doesn't exist.
+
+        method 'hash' groups the keys of the smaller dataframe into a lookup table and probes it
+        with the keys of the larger one in batches. method 'merge' requires both key columns to
+        be sorted and merges them in linear time.
+
+        If raw is True, returns a dict mapping column names to NumPy arrays (lists for string
+        columns) instead, without importing pandas.
+
+        @param left_bytes: bytes of the left Flatbuffer Dataframe.
+        @param right_bytes: bytes of the right Flatbuffer Dataframe.
+        @param left_on: key column of the left dataframe.
+        @param right_on: key column of the right dataframe, left_on if None.
+        @param left_columns: left columns to return, all of them if None.
+        @param right_columns: right columns to return, all of them (except a key named like left_on) if None.
+        @param method: 'hash' or 'merge'.
+        @param batch_rows: number of keys probed at a time by method 'hash'.
+        @param raw: whether to return a dict of arrays.
+    """
+    if(method not in ('hash', 'merge')):
+        raise ValueError(f"Unknown join method '{method}', expected 'hash' or 'merge'")
+    right_on=left_on if right_on is None else right_on
+    left=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(left_bytes), 0)
+    right=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(right_bytes), 0)
+    if(left_columns is None):
+        left_columns=_column_names(left)
+    if(right_columns is None):
+        right_columns=[c for c in _column_names(right) if not (c == right_on and right_on == left_on)]
+    left_cols=_find_columns(left, left_on, *left_columns)
+    right_cols=_find_columns(right, right_on, *right_columns)
+    if(None in left_cols or None in right_cols):
+        return None
+    string=ValueType.ValueType().String
+    if((left_cols[0].Metadata().Dtype() == string) != (right_cols[0].Metadata().Dtype() == string)):
+        raise ValueError(f"Can't join string column with numeric column ('{left_on}', '{right_on}')")
+    left_keys, right_keys = [_column_values(c) for c in (left_cols[0], right_cols[0])]
+    left_keys, right_keys = [np.array(k) if isinstance(k, list) else k for k in (left_keys, right_keys)]
+    if(method == 'merge'):
+        for keys, name in ((left_keys, left_on), (right_keys, right_on)):
+            if(np.any(keys[1:] < keys[:-1])):
+                raise ValueError(f"Join key '{name}' isn't sorted, use method 'hash'")
+        left_rows, right_rows = _merge_rows(left_keys, right_keys)
+    elif(len(left_keys) < len(right_keys)):
+        left_rows, right_rows = _join_rows(left_keys, right_keys, batch_rows)
+        order=np.lexsort((right_rows, left_rows))
+        left_rows, right_rows = left_rows[order], right_rows[order]
+    else:
+        right_rows, left_rows = _join_rows(right_keys, left_keys, batch_rows)
+    columns=dict()
+    for name, col in zip(left_columns, left_cols[1:]):
+        columns[name + '_x' if name in right_columns else name]=_take_values(col, left_rows)
+    for name, col in zip(right_columns, right_cols[1:]):
+        columns[name + '_y' if name in left_columns else name]=_take_values(col, right_rows)
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=len(left_rows), columns=len(columns), bytes=sum(_values_nbytes(v) for v in columns.values()))
+    if(raw):
+        return columns
+    import pandas as pd
+    return pd.DataFrame(columns)
+
+
+def _fresh_index(col: Column.Column) -> Index.Index:
+    """
+        Returns the index of a column, or None if it has none or it is stale.
+
+        @param col: the column.
+    """
+    index=col.Index()
+    return None if index is None or index.Stale() else index
+
+
+def _matches(values, value) -> np.ndarray:
+    """
+        Returns the boolean mask of the column values equal to value.
+
+        @param values: NumPy array, or list of strings.
+        @param value: the value to look for.
+    """
+    if(isinstance(values, np.ndarray)):
+        return values == value
+    return np.array([v == value for v in values], dtype=bool)
+
+
+def _in_range(values, low, high) -> np.ndarray:
+    """
+        Returns the boolean mask of the column values in [low, high), a missing bound being unbounded.
+
+        @param values: NumPy array, or list of strings.
+        @param low: smallest value, or None.
+        @param high: value after the largest one, or None.
+    """
+    return np.array([(low is None or low <= v) and (high is None or v < high) for v in values], dtype=bool)
+
+
+def _sorted_position(col: Column.Column, index: Index.Index, value, side: str) -> int:
+    """
+        Returns the position where value would be inserted in the sorted order of a column, as
+        np.searchsorted does. Numeric columns search the sorted values in the index, or the
+        column itself if it is sorted; string columns binary search through the permutation.
+
+        @param col: the column.
+        @param index: its sorted index.
+        @param value: the value to look for.
+        @param side: 'left' or 'right'.
+    """
+    m=col.Metadata()
+    if(index.SortedIntLength()):
+        return int(np.searchsorted(index.SortedIntAsNumpy(), value, side))
+    if(index.SortedFloatLength()):
+        return int(np.searchsorted(index.SortedFloatAsNumpy(), value, side))
+    if(m.Dtype() != ValueType.ValueType().String):
+        return int(np.searchsorted(_column_values(col), value, side))
+    permutation=index.PermutationAsNumpy() if index.PermutationLength() else None
+    lo, hi = 0, col.StringvalLength()
+    while(lo < hi):
+        mid=(lo + hi) // 2
+        v=col.Stringval(mid if permutation is None else int(permutation[mid])).decode()
+        if(v < value or (side == 'right' and v == value)):
+            lo=mid + 1
+        else:
+            hi=mid
+    return lo
+
+
+def _sorted_rows(col: Column.Column, index: Index.Index, low, high, high_side: str) -> np.ndarray:
+    """
+        Returns the rows, in increasing order, whose values are between low and high in the
+        sorted order of a column.
+
+        @param col: the column.
+        @param index: its sorted index.
+        @param low: smallest value, or None.
+        @param high: largest value (high_side 'right') or value after it (high_side 'left'), or None.
+        @param high_side: side of the search for high.
+    """
+    lo=0 if low is None else _sorted_position(col, index, low, 'left')
+    hi=_column_length(col) if high is None else _sorted_position(col, index, high, high_side)
+    hi=max(lo, hi)
+    if(not index.PermutationLength()):
+        return np.arange(lo, hi)
+    return np.sort(index.PermutationAsNumpy()[lo:hi])
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_lookup(fb_bytes: bytes, col_name: str, value) -> np.ndarray:
+    """
+        Returns the rows, in increasing order, where col_name equals value. Uses the column's
+        index when it has a fresh one, in O(log n) for a sorted index and O(1) expected for a
+        hash index, and scans the column otherwise. Returns None if col_name doesn't exist.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+        @param col_name: column to search.
+        @param value: the value to look for.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(fb_bytes), 0)
+    col=_find_columns(fb_df, col_name)[0]
+    if(col is None):
+        return None
+    index=_fresh_index(col)
+    if(index is None):
+        rows=np.flatnonzero(_matches(_column_values(col), value))
+    elif(index.Kind() == IndexKind.IndexKind().Sorted):
+        rows=_sorted_rows(col, index, value, value, 'right')
+    else:
+        dtype=col.Metadata().Dtype()
+        key=[str(value)] if dtype == ValueType.ValueType().String else \
+            np.array([value], dtype=np.float64 if dtype == ValueType.ValueType().Float else np.int64)
+        buckets=index.BucketsAsNumpy()
+        b=hash_buckets(key, len(buckets) - 1)[0]
+        candidates=index.PermutationAsNumpy()[buckets[b]:buckets[b+1]]
+        rows=np.sort(candidates[_matches(_take_values(col, candidates), value)])
+    fb_metrics.count(rows=len(rows), columns=1)
+    return rows
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_range_lookup(fb_bytes: bytes, col_name: str, low=None, high=None) -> np.ndarray:
+    """
+        Returns the rows, in increasing order, where low <= col_name < high (a missing bound
+        being unbounded). Uses the column's sorted index when it has a fresh one, in O(log n)
+        plus the rows returned (a row range when the column itself is sorted), and scans the
+        column otherwise. Returns None if col_name doesn't exist.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+        @param col_name: column to search.
+        @param low: smallest value, or None.
+        @param high: value after the largest one, or None.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(fb_bytes), 0)
+    col=_find_columns(fb_df, col_name)[0]
+    if(col is None):
+        return None
+    index=_fresh_index(col)
+    if(index is not None and index.Kind() == IndexKind.IndexKind().Sorted):
+        rows=_sorted_rows(col, index, low, high, 'left')
+    else:
+        values=_column_values(col)
+        if(isinstance(values, np.ndarray)):
+            mask=np.ones(len(values), dtype=bool)
+            if(low is not None):
+                mask&=values >= low
+            if(high is not None):
+                mask&=values < high
+        else:
+            mask=_in_range(values, low, high)
+        rows=np.flatnonzero(mask)
+    fb_metrics.count(rows=len(rows), columns=1)
+    return rows
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_take(fb_bytes: bytes, rows, columns: list = None, raw: bool = False) -> pd.DataFrame:
+    """
+        Returns the given rows of the flatbuffer dataframe, e.g. those found by
+        fb_dataframe_lookup, as a Pandas Dataframe. Returns None if a column doesn't exist.
+
+        If raw is True, returns a dict mapping column names to NumPy arrays (lists for string
+        columns) instead, without importing pandas.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+        @param rows: row indices.
+        @param columns: columns to return, all of them if None.
+        @param raw: whether to return a dict of arrays.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(fb_bytes), 0)
+    columns=_column_names(fb_df) if columns is None else columns
+    cols=_find_columns(fb_df, *columns)
+    if(None in cols):
+        return None
+    rows=np.asarray(rows, dtype=np.intp)
+    res={name: _take_values(col, rows) for name, col in zip(columns, cols)}
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=len(rows), columns=len(res), bytes=sum(_values_nbytes(v) for v in res.values()))
+    if(raw):
+        return res
+    import pandas as pd
+    return pd.DataFrame(res)
+
+
+def fb_dataframe_layout(fb_bytes: bytes) -> dict:
+    """
+        Returns the encodings and indexes of the columns of the flatbuffer dataframe, as the
+        to_flatbuffer keyword arguments that re-serialize it alike.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(memoryview(fb_bytes), 0)
+    encoding_names={v: k for k, v in ENCODINGS.items()}
+    index_names={v: k for k, v in INDEXES.items()}
+    encodings, indexes = dict(), dict()
+    for i in range(fb_df.ColumnsLength()):
+        col=fb_df.Columns(i)
+        name=col.Metadata().Name().decode()
+        if(col.Metadata().Encoding() != Encoding.Encoding().Plain):
+            encodings[name]=encoding_names[col.Metadata().Encoding()]
+        if(col.Index() is not None):
+            indexes[name]=index_names[col.Index().Kind()]
+    return {'encodings': encodings, 'indexes': indexes}
+
+
+def fb_dataframe_version(fb_bytes: bytes) -> int:
+    """
+        Returns the version of the flatbuffer dataframe, bumped by every in-place modification.
+
+        @param fb_bytes: bytes of the Flatbuffer Dataframe.
+    """
+    return DataFrame.DataFrame.GetRootAsDataFrame(fb_bytes, 0).Version()
+
+
+def fb_dataframe_supersede(fb_buf: memoryview) -> None:
+    """
+        Sets the version of the flatbuffer dataframe to SUPERSEDED_VERSION in place, telling
+        readers still holding it that it was replaced.
+
+        @param fb_buf: buffer containing bytes of the Flatbuffer Dataframe.
+    """
+    fb_df=DataFrame.DataFrame.GetRootAsDataFrame(fb_buf, 0)
+    _set_scalar_field(fb_df, _DATAFRAME_VERSION, '<Q', SUPERSEDED_VERSION)
+
+
+def _set_scalar_field(table, vtable_offset: int, fmt: str, value) -> None:
+    """
+        Overwrites a scalar field of a flatbuffer table in place. The field must have been
+        written when the table was built.
+
+        @param table: generated table object (e.g. Metadata) over a writable buffer.
+        @param vtable_offset: vtable offset of the field.
+        @param fmt: struct format of the field, e.g. '<q'.
+        @param value: new value.
+    """
+    o=table._tab.Offset(vtable_offset)
+    if(o == 0):
+        raise ValueError("Cannot update a field that was not written into the flatbuffer")
+    struct.pack_into(fmt, table._tab.Bytes, table._tab.Pos + o, value)
+
+
+def _refresh_stats(column: Column.Column, refresh: bool = True) -> None:
+    """
+        Recomputes the statistics of a column after its values changed, or only marks them stale
+        if refresh is False. Does nothing for columns without statistics.
+
+        @param column: the column, over a writable buffer.
+        @param refresh: whether to recompute the statistics.
+    """
+    m=column.Metadata()
+    if(m.Stats() is None):
+        return
+    if(refresh):
+        values=_column_values(column)
+        _write_stats(m.Stats(), column_stats(values), m.Dtype())
+        if(m.ChunkStatsLength()):
+            for i, chunk in enumerate(chunk_stats(values, m.ChunkRows())):
+                _write_stats(m.ChunkStats(i), chunk, m.Dtype())
+    _set_scalar_field(m, _METADATA_STATS_STALE, '<?', not refresh)
+
+
+def _write_vector(table, vtable_offset: int, values: np.ndarray) -> None:
+    """
+        Overwrites a vector of a flatbuffer table in place with as many values of its type.
+
+        @param table: generated table object (e.g. Index) over a writable buffer.
+        @param vtable_offset: vtable offset of the vector field.
+        @param values: new int64 or float64 values.
+    """
+    start=table._tab.Vector(table._tab.Offset(vtable_offset))
+    np.frombuffer(table._tab.Bytes, dtype=values.dtype, count=len(values), offset=start)[:]=values
+
+
+def _refresh_index(column: Column.Column) -> None:
+    """
+        Rebuilds the index of a numeric column in place after its values changed. A sorted index
+        of a column that was sorted has no permutation, so it is marked stale if the column no
+        longer is. Does nothing for columns without an index.
+
+        @param column: the column, over a writable buffer.
+    """
+    index=column.Index()
+    if(index is None):
+        return
+    values=_column_values(column)
+    if(index.Kind() == IndexKind.IndexKind().Hash):
+        permutation, buckets = build_hash(values)
+        _write_vector(index, _INDEX_BUCKETS, buckets.astype(np.int64))
+    else:
+        permutation, sorted_values = build_sorted(values)
+        if(not index.PermutationLength()):
+            _set_scalar_field(index, _INDEX_STALE, '<?', permutation is not None)
+            if(permutation is not None):
+                return
+        elif(permutation is None):
+            permutation=np.arange(len(values))
+        if(index.SortedIntLength()):
+            _write_vector(index, _INDEX_SORTED_INT, sorted_values.astype(np.int64))
+        elif(index.SortedFloatLength()):
+            _write_vector(index, _INDEX_SORTED_FLOAT, sorted_values.astype(np.float64))
+    if(permutation is not None and index.PermutationLength()):
+        _write_vector(index, _INDEX_PERMUTATION, permutation.astype(np.int64))
+
+
+def _map_encoded_int_column(column: Column.Column, map_func: types.FunctionType) -> None:
+    """
+        Applies map_func to an encoded int column in place. Run-length columns map their run
+        values; delta and bit-packed columns are decoded, mapped and re-packed with the same bit
+        width. Raises BitWidthOverflow if the mapped values don't fit in it.
+
+        @param column: the encoded column, over a writable buffer.
+        @param map_func: function to apply to elements in the column.
+    """
+    m=column.Metadata()
+    if(m.Encoding() == Encoding.Encoding().RunLength):
+        if(column.IntvalLength()):
+            run_values=column.IntvalAsNumpy()
+            run_values[:]=[map_func(v) for v in run_values.tolist()]
+        return
+    values=mapped=np.array([map_func(v) for v in _int_values(column).tolist()], dtype=np.int64)
+    if(m.Encoding() == Encoding.Encoding().Delta):
+        first=int(values[0]) if len(values) else 0
+        values=np.diff(values, prepend=first)
+    base, width = bit_width(values)
+    if(width > m.BitWidth()):
+        raise BitWidthOverflow(f"Mapped values of column '{m.Name().decode()}' need {width} bits, but the column is packed with {m.BitWidth()}", mapped)
+    if(column.PackedLength()):
+        packed=column.PackedAsNumpy()
+        bits=pack_bits(to_codes(values, base), m.BitWidth())
+        packed[:]=0
+        packed[:len(bits)]=bits
+    _set_scalar_field(m, _METADATA_BASE, '<q', base)
+    if(m.Encoding() == Encoding.Encoding().Delta):
+        _set_scalar_field(m, _METADATA_FIRST, '<q', first)
+
+
+@fb_metrics.instrumented()
+def fb_dataframe_map_numeric_column(fb_buf: memoryview, col_name: str, map_func: types.FunctionType,
+                                    refresh_stats: bool = True) -> None:
     """
         Apply map_func to elements in a numeric column in the Flatbuffer Dataframe in place.
         This function shouldn't do anything if col_name doesn't exist or the specified
-        column is a string column.
+        column is a string column. Otherwise the version of the dataframe is bumped.
+
+        The column statistics are recomputed, or only marked stale if refresh_stats is False
+        (e.g. when mapping the same column several times in a row). The column's index, if any,
+        is rebuilt in place.
 
         @param fb_buf: buffer containing bytes of the Flatbuffer Dataframe.
         @param col_name: name of the numeric column to apply map_func to.
         @param map_func: function to apply to elements in the numeric column.
+        @param refresh_stats: whether to recompute the column statistics.
     """
     fb_bytes=bytearray(fb_buf)
     fb_df=DataFrame.DataFrame.GetRootAsDataFrame(fb_bytes, 0)
@@ -199,7 +1233,9 @@ def fb_dataframe_map_numeric_column(fb_buf: memoryview, col_name: str, map_func:
                 break
     if(not column):
         return
-    if(ValueType.ValueType().Int==column.Metadata().Dtype()):
+    if(column.Metadata().Encoding() != Encoding.Encoding().Plain):
+        _map_encoded_int_column(column, map_func)
+    elif(ValueType.ValueType().Int==column.Metadata().Dtype()):
         start=column._tab.Vector(column._tab.Offset(6))
         n=column.IntvalLength()
         for j in range(n):
@@ -215,5 +1251,12 @@ def fb_dataframe_map_numeric_column(fb_buf: memoryview, col_name: str, map_func:
             og=struct.unpack('<d', fb_bytes[offset:offset + 8])[0]
             val=map_func(og)
             fb_bytes[offset:offset+8] = struct.pack('<d', val)
-    fb_buf[:]=fb_bytes 
+    _refresh_stats(column, refresh_stats)
+    _refresh_index(column)
+    if(fb_df._tab.Offset(_DATAFRAME_VERSION)):
+        _set_scalar_field(fb_df, _DATAFRAME_VERSION, '<Q', fb_df.Version() + 1)
+    fb_buf[:]=fb_bytes
+    if(fb_metrics.enabled()):
+        fb_metrics.count(rows=_column_length(column), columns=1, bytes=_column_nbytes(column),
+                         copies=2, copied_bytes=2 * len(fb_bytes))
     
@@ -0,0 +1,164 @@
+import numpy as np
+from DataFrame import Encoding
+
+ENCODINGS = {
+    'plain': Encoding.Encoding().Plain,
+    'rle': Encoding.Encoding().RunLength,
+    'delta': Encoding.Encoding().Delta,
+    'bitpack': Encoding.Encoding().BitPacked,
+}
+
+
+def to_codes(values: np.ndarray, base: int) -> np.ndarray:
+    """
+        Returns values - base as uint64 codes. The subtraction wraps around, which is exact
+        as long as max(values) - base fits in 64 bits.
+    """
+    return values.astype(np.int64).view(np.uint64) - np.array(base, dtype=np.int64).view(np.uint64)
+
+
+def from_codes(codes: np.ndarray, base: int) -> np.ndarray:
+    """
+        Inverse of to_codes: returns codes + base as int64 values.
+    """
+    return (codes.astype(np.uint64) + np.array(base, dtype=np.int64).view(np.uint64)).view(np.int64)
+
+
+def bit_width(values: np.ndarray) -> tuple:
+    """
+        Returns (base, width) for frame-of-reference bit-packing of values: base is the
+        minimum value and width the number of bits needed for max - base.
+
+        @param values: int64 values.
+    """
+    if(len(values) == 0):
+        return 0, 0
+    base = int(values.min())
+    return base, (int(values.max()) - base).bit_length()
+
+
+def pack_bits(codes: np.ndarray, width: int) -> np.ndarray:
+    """
+        Packs unsigned codes into a little-endian bit stream using width bits per code.
+        Returns a uint8 array of ceil(len(codes) * width / 8) bytes.
+
+        @param codes: uint64 codes, each smaller than 2 ** width.
+        @param width: bits per code (0 - 64).
+    """
+    if(width == 0 or len(codes) == 0):
+        return np.zeros(0, dtype=np.uint8)
+    if(width in (8, 16, 32, 64)):
+        return codes.astype('<u%d' % (width // 8)).view(np.uint8)
+    shifts = np.arange(width, dtype=np.uint64)
+    bits = ((codes.astype(np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits.ravel(), bitorder='little')
+
+
+def unpack_bits(packed: np.ndarray, width: int, n: int) -> np.ndarray:
+    """
+        Unpacks the first n codes from a bit stream produced by pack_bits. Returns uint64 codes.
+
+        @param packed: uint8 bit stream.
+        @param width: bits per code.
+        @param n: number of codes to unpack.
+    """
+    if(width == 0 or n == 0):
+        return np.zeros(n, dtype=np.uint64)
+    if(width in (8, 16, 32, 64)):
+        return np.frombuffer(packed, dtype='<u%d' % (width // 8), count=n).astype(np.uint64)
+    bits = np.unpackbits(packed, count=n * width, bitorder='little').reshape(n, width)
+    weights = np.left_shift(np.uint64(1), np.arange(width, dtype=np.uint64))
+    return bits.astype(np.uint64) @ weights
+
+
+def encode_rle(values: np.ndarray) -> tuple:
+    """
+        Run-length encodes values. Returns (run_values, run_lengths) as int64 arrays.
+
+        @param values: int64 values.
+    """
+    if(len(values) == 0):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.diff(values)) + 1
+    starts = np.concatenate(([0], starts))
+    lengths = np.diff(np.concatenate((starts, [len(values)])))
+    return values[starts].astype(np.int64), lengths.astype(np.int64)
+
+
+def decode_rle(run_values: np.ndarray, run_lengths: np.ndarray, rows: int = None) -> np.ndarray:
+    """
+        Decodes the first rows values (all values if rows is None) of a run-length encoded column.
+
+        @param run_values: value of each run.
+        @param run_lengths: length of each run.
+        @param rows: number of values to decode.
+    """
+    if(rows is not None):
+        ends = np.cumsum(run_lengths)
+        nruns = int(np.searchsorted(ends, rows)) + 1
+        return np.repeat(run_values[:nruns], run_lengths[:nruns])[:rows]
+    return np.repeat(run_values, run_lengths)
+
+
+def encode_delta(values: np.ndarray) -> tuple:
+    """
+        Delta encodes values and bit-packs the deltas with frame-of-reference.
+        Returns (first, base, width, packed).
+
+        @param values: int64 values.
+    """
+    first = int(values[0]) if len(values) else 0
+    deltas = np.diff(values, prepend=first)
+    base, width = bit_width(deltas)
+    return first, base, width, pack_bits(to_codes(deltas, base), width)
+
+
+def decode_delta(packed: np.ndarray, first: int, base: int, width: int, n: int) -> np.ndarray:
+    """
+        Decodes the first n values of a delta encoded column.
+
+        @param packed: bit-packed deltas.
+        @param first: first value of the column.
+        @param base: frame of reference of the deltas.
+        @param width: bits per delta.
+        @param n: number of values to decode.
+    """
+    deltas = from_codes(unpack_bits(packed, width, n), base)
+    return first + np.cumsum(deltas)
+
+
+def encode_bitpack(values: np.ndarray) -> tuple:
+    """
+        Frame-of-reference bit-packs values. Returns (base, width, packed).
+
+        @param values: int64 values.
+    """
+    base, width = bit_width(values)
+    return base, width, pack_bits(to_codes(values, base), width)
+
+
+def decode_bitpack(packed: np.ndarray, base: int, width: int, n: int) -> np.ndarray:
+    """
+        Decodes the first n values of a frame-of-reference bit-packed column.
+
+        @param packed: bit-packed codes.
+        @param base: frame of reference.
+        @param width: bits per code.
+        @param n: number of values to decode.
+    """
+    return from_codes(unpack_bits(packed, width, n), base)
+
+
+def choose_encoding(values: np.ndarray) -> int:
+    """
+        Returns the encoding giving the smallest payload for values, preferring Plain on ties.
+
+        @param values: int64 values.
+    """
+    n = len(values)
+    sizes = {ENCODINGS['plain']: 8 * n}
+    if(n > 0):
+        sizes[ENCODINGS['rle']] = 16 * (int(np.count_nonzero(np.diff(values))) + 1)
+        sizes[ENCODINGS['bitpack']] = (n * bit_width(values)[1] + 7) // 8
+        sizes[ENCODINGS['delta']] = (n * bit_width(np.diff(values, prepend=values[0]))[1] + 7) // 8
+    return min(sizes, key=lambda e: (sizes[e], e))
@@ -0,0 +1,65 @@
+import zlib
+import numpy as np
+from DataFrame import IndexKind
+
+INDEXES = {'sorted': IndexKind.IndexKind().Sorted, 'hash': IndexKind.IndexKind().Hash}
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def is_sorted(values) -> bool:
+    """
+        Returns whether values are in non-decreasing order. Floats with NaNs are never sorted.
+
+        @param values: NumPy array, or list of strings.
+    """
+    if(not isinstance(values, np.ndarray)):
+        return all(a <= b for a, b in zip(values, values[1:]))
+    return bool(np.all(values[1:] >= values[:-1]))
+
+
+def build_sorted(values) -> tuple:
+    """
+        Builds a sorted index. Returns (permutation, sorted values): the rows in increasing order
+        of their values and the values in that order. The permutation is None if the values are
+        already sorted, and the sorted values are None for string columns.
+
+        @param values: NumPy array of int64 or float64 values, or list of strings.
+    """
+    numeric = isinstance(values, np.ndarray)
+    if(is_sorted(values)):
+        return None, (values if numeric else None)
+    permutation = np.argsort(values if numeric else np.array(values), kind='stable')
+    return permutation, (values[permutation] if numeric else None)
+
+
+def hash_buckets(values, nbuckets: int) -> np.ndarray:
+    """
+        Returns the bucket of every value in a hash table of nbuckets buckets, a power of two of
+        at least 2. Strings hash with CRC-32 so that buckets don't depend on the process.
+
+        @param values: NumPy array of int64 or float64 values, or list of strings.
+        @param nbuckets: number of buckets.
+    """
+    if(not isinstance(values, np.ndarray)):
+        bits = np.array([zlib.crc32(v.encode()) for v in values], dtype=np.uint64)
+    elif(values.dtype.kind == 'f'):
+        # Adding 0.0 turns -0.0 into 0.0, so that equal values share a bucket.
+        bits = (values.astype(np.float64) + 0.0).view(np.uint64)
+    else:
+        bits = values.astype(np.int64).view(np.uint64)
+    return ((bits * _GOLDEN) >> np.uint64(64 - (nbuckets.bit_length() - 1))).astype(np.intp)
+
+
+def build_hash(values) -> tuple:
+    """
+        Builds a hash index. Returns (permutation, buckets): the rows grouped by bucket, and the
+        start of every bucket in the permutation followed by its length, so that the rows of
+        bucket b are permutation[buckets[b]:buckets[b+1]].
+
+        @param values: NumPy array of int64 or float64 values, or list of strings.
+    """
+    nbuckets = 1 << max(1, (len(values) - 1).bit_length())
+    codes = hash_buckets(values, nbuckets)
+    permutation = np.argsort(codes, kind='stable')
+    return permutation, np.searchsorted(codes[permutation], np.arange(nbuckets + 1))
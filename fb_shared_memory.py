@@ -1,48 +1,283 @@
-import dill
+from __future__ import annotations
+import fb_metrics
+import functools
 import json
-import hashlib
-import pandas as pd
+import os
 import types
 import struct
-from multiprocessing import shared_memory
-from fb_dataframe import to_flatbuffer, fb_dataframe_head, fb_dataframe_group_by_sum, fb_dataframe_map_numeric_column
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING
+from fb_cache import ResultCache
+from fb_dataframe import to_flatbuffer, fb_dataframe_head, fb_dataframe_group_by_sum, fb_dataframe_map_numeric_column, \
+    fb_dataframe_sum, fb_dataframe_aggregate, fb_dataframe_describe, fb_dataframe_join, fb_dataframe_version, \
+    fb_dataframe_lookup, fb_dataframe_range_lookup, fb_dataframe_take, fb_dataframe_layout, fb_dataframe_supersede, \
+    BitWidthOverflow, SUPERSEDED_VERSION
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# The catalog is mirrored in the shared memory segment '<name>_catalog' as a (sequence number,
+# length) header followed by its JSON. Writers make the sequence number odd while writing, so
+# readers retry instead of reading a partial catalog, for up to CATALOG_RETRIES times
+# CATALOG_RETRY_SECONDS in case the writer died while writing.
+CATALOG_HEADER = struct.Struct('II')
+CATALOG_MIN_SIZE = 1 << 20
+CATALOG_RETRIES = 1000
+CATALOG_RETRY_SECONDS = 0.001
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """
+        Attaches to an existing shared memory segment without registering it with the resource
+        tracker, which would otherwise unlink it when this process exits. Raises
+        FileNotFoundError if it doesn't exist.
+
+        @param name: name of the shared memory segment.
+    """
+    if(sys.version_info >= (3, 13)):
+        return shared_memory.SharedMemory(name = name, track=False)
+    shm = shared_memory.SharedMemory(name = name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _unlink_segment(shm: shared_memory.SharedMemory) -> None:
+    """
+        Unlinks a shared memory segment, whether this process created it or attached to it.
+
+        @param shm: the shared memory segment.
+    """
+    if(sys.version_info < (3, 13)):
+        # unlink() unregisters the segment, so it must be registered, even if attached.
+        resource_tracker.register(shm._name, 'shared_memory')
+    shm.unlink()
+
+
 class FbSharedMemory:
     """
         Class for managing the shared memory for holding flatbuffer dataframes.
     """
-    def __init__(self):
+    def __init__(self, name: str = "CS598", size: int = 200000000, catalog_path: str = 'startdict.json',
+                 cache_bytes: int = 64 * 1024 * 1024):
+        """
+            Attaches to the shared memory segment 'name', creating it with 'size' bytes if it doesn't exist.
+
+            @param name: name of the shared memory segment.
+            @param size: size of the segment in bytes, used when creating it.
+            @param catalog_path: file mapping dataframe names to their offsets in the segment.
+            @param cache_bytes: size of the head / group-by result cache, 0 to disable it.
+        """
+        created = False
         try:
-            self.df_shared_memory = shared_memory.SharedMemory(name = "CS598")
+            self.df_shared_memory = _attach_segment(name)
         except FileNotFoundError:
-            self.df_shared_memory = shared_memory.SharedMemory(name = "CS598", create=True, size=200000000)
-        self.start = 0
+            self.df_shared_memory = shared_memory.SharedMemory(name = name, create=True, size=size)
+            created = True
+        self.catalog_path = catalog_path
+        self.catalog_shared_memory = None
+        self.owner = True
         self.startdict = dict()
-        try:
-            with open('startdict.json', 'r') as f:
-                self.startdict = json.load(f)
-        except FileNotFoundError:
-            self.startdict = {}
+        if(not created):
+            # Prefer the shared catalog; the file may be left over from an earlier segment.
+            try:
+                self.startdict = self._read_shared_catalog()
+            except TimeoutError:
+                self.startdict = None
+            if(self.startdict is None):
+                try:
+                    with open(self.catalog_path, 'r') as f:
+                        self.startdict = json.load(f)
+                except FileNotFoundError:
+                    self.startdict = {}
+        self.start = self.segment_stats()['end']
+        self.cache = ResultCache(cache_bytes)
+
+    @classmethod
+    def attach(cls, name: str = "CS598", cache_bytes: int = 0) -> FbSharedMemory:
+        """
+            Attaches to an existing shared memory segment and its shared catalog without any file
+            I/O, for short-lived guest processes. Raises FileNotFoundError if the segment doesn't
+            exist, and TimeoutError if the catalog stays partially written. Combined with the
+            raw=True query options, pandas is never imported. close() only detaches the guest,
+            leaving the segments to their owner.
+
+            @param name: name of the shared memory segment.
+            @param cache_bytes: size of the head / group-by result cache, 0 to disable it.
+        """
+        self = cls.__new__(cls)
+        self.df_shared_memory = _attach_segment(name)
+        self.catalog_path = None
+        self.catalog_shared_memory = None
+        self.owner = False
+        self.startdict = self._read_shared_catalog() or {}
+        self.start = self.segment_stats()['end']
+        self.cache = ResultCache(cache_bytes)
+        return self
+
+    def _read_shared_catalog(self) -> dict:
+        """
+            Returns the catalog mirrored in shared memory, or None if there is none. Raises
+            TimeoutError if it is still being written after CATALOG_RETRIES retries.
+        """
+        if(self.catalog_shared_memory is None):
+            try:
+                self.catalog_shared_memory = _attach_segment(self.df_shared_memory.name + "_catalog")
+            except FileNotFoundError:
+                return None
+        buf = self.catalog_shared_memory.buf
+        for _ in range(CATALOG_RETRIES):
+            seq, n = CATALOG_HEADER.unpack_from(buf, 0)
+            if(seq % 2 == 0):
+                payload = bytes(buf[CATALOG_HEADER.size:CATALOG_HEADER.size+n])
+                if(CATALOG_HEADER.unpack_from(buf, 0)[0] == seq):
+                    return json.loads(payload) if n else {}
+            time.sleep(CATALOG_RETRY_SECONDS)
+        raise TimeoutError(f"The catalog of shared memory segment '{self.df_shared_memory.name}' is still being written")
+
+    def _write_catalog(self) -> None:
+        """
+            Writes the catalog to the shared catalog segment and, unless attached with attach(),
+            to the catalog file.
+        """
+        payload = json.dumps(self.startdict).encode()
+        need = CATALOG_HEADER.size + len(payload)
+        if(self.catalog_shared_memory is None):
+            try:
+                self.catalog_shared_memory = _attach_segment(self.df_shared_memory.name + "_catalog")
+            except FileNotFoundError:
+                pass
+        if(self.catalog_shared_memory is None or self.catalog_shared_memory.size < need):
+            if(self.catalog_shared_memory is not None):
+                # Grow the catalog segment; processes attaching later get the new one.
+                self.catalog_shared_memory.close()
+                _unlink_segment(self.catalog_shared_memory)
+            self.catalog_shared_memory = shared_memory.SharedMemory(name = self.df_shared_memory.name + "_catalog",
+                                                                    create=True, size=max(CATALOG_MIN_SIZE, 2 * need))
+        buf = self.catalog_shared_memory.buf
+        # The sequence number is already odd if a writer died while writing.
+        seq = ((CATALOG_HEADER.unpack_from(buf, 0)[0] + 1) | 1) & 0xFFFFFFFF
+        CATALOG_HEADER.pack_into(buf, 0, seq, 0)
+        buf[CATALOG_HEADER.size:need] = payload
+        CATALOG_HEADER.pack_into(buf, 0, (seq + 1) & 0xFFFFFFFF, len(payload))
+        if(self.catalog_path is not None):
+            # Replace the file in one step so that readers never see a partial catalog.
+            with open(self.catalog_path + '.tmp', 'w') as f:
+                json.dump(self.startdict, f)
+            os.replace(self.catalog_path + '.tmp', self.catalog_path)
 
-    def add_dataframe(self, name: str, df: pd.DataFrame) -> None:
+    @fb_metrics.instrumented()
+    def add_dataframe(self, name: str, df: pd.DataFrame, encodings: dict = None, indexes: dict = None) -> None:
         """
             Adds a dataframe into the shared memory. Does nothing if a dataframe with 'name' already exists.
 
             @param name: name of the dataframe.
             @param df: the dataframe to add to shared memory.
+            @param encodings: optional mapping of int column name to encoding, see to_flatbuffer.
+            @param indexes: optional mapping of column name to index ('sorted' or 'hash'), see to_flatbuffer.
         """
         if(name in self.startdict):
             return
-        x=to_flatbuffer(df)
-        s=len(x)
-        tot=4+s
-        if(self.start+tot>self.df_shared_memory.size):
+        self._write_dataframe(name, to_flatbuffer(df, encodings, indexes=indexes))
+
+    @fb_metrics.instrumented()
+    def add_dataframes(self, frames: dict, encodings: dict = None, indexes: dict = None, max_workers: int = 1) -> None:
+        """
+            Adds several dataframes into the shared memory at once. The dataframes are serialized,
+            space is reserved for all of them, they are copied in and the catalog is written once,
+            so that other processes see either none or all of them.
+            Dataframes whose name already exists are skipped. Does nothing if they don't all fit
+            in the shared memory.
+
+            @param frames: mapping of name to dataframe.
+            @param encodings: optional mapping of int column name to encoding, see to_flatbuffer.
+            @param indexes: optional mapping of column name to index ('sorted' or 'hash'), see to_flatbuffer.
+            @param max_workers: number of processes serializing the dataframes, os.cpu_count() if
+                None. The default 1 serializes them in this process, which is faster unless the
+                dataframes are large enough to outweigh pickling them to and from the workers.
+        """
+        frames={name: df for name, df in frames.items() if name not in self.startdict}
+        serialize=functools.partial(to_flatbuffer, encodings=encodings, indexes=indexes)
+        workers=min(max_workers or os.cpu_count() or 1, len(frames))
+        if(workers > 1):
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(workers) as executor:
+                fb_frames=list(executor.map(serialize, frames.values(), chunksize=max(1, len(frames) // (4 * workers))))
+        else:
+            fb_frames=[serialize(df) for df in frames.values()]
+        self._write_dataframes(dict(zip(frames, fb_frames)))
+
+    @fb_metrics.instrumented()
+    def replace_dataframe(self, name: str, df: pd.DataFrame, encodings: dict = None, indexes: dict = None) -> None:
+        """
+            Adds a dataframe into the shared memory, replacing the dataframe with 'name' if it exists.
+            The replacement is written after the existing dataframes and gets the next version. The
+            old dataframe is then marked as superseded, so that other processes still using it
+            re-read the shared catalog, and cached results of it are no longer used. The space of
+            the old dataframe is not reclaimed.
+
+            @param name: name of the dataframe.
+            @param df: the dataframe to add to shared memory.
+            @param encodings: optional mapping of int column name to encoding, see to_flatbuffer.
+            @param indexes: optional mapping of column name to index ('sorted' or 'hash'), see to_flatbuffer.
+        """
+        old=self._get_fb_buf(name)
+        old_start=self.startdict.get(name)
+        version=fb_dataframe_version(old) + 1 if old is not None else 0
+        self._write_dataframe(name, to_flatbuffer(df, encodings, version=version, indexes=indexes))
+        if(old is not None and self.startdict[name] != old_start):
+            fb_dataframe_supersede(old)
+        self.cache.invalidate(name)
+
+    def _write_dataframe(self, name: str, x: bytearray) -> None:
+        """
+            Copies a flatbuffer dataframe after the existing ones and records it in the catalog.
+            Does nothing if it doesn't fit in the shared memory.
+
+            @param name: name of the dataframe.
+            @param x: bytes of the Flatbuffer Dataframe.
+        """
+        self._write_dataframes({name: x})
+
+    def _write_dataframes(self, fb_frames: dict) -> None:
+        """
+            Copies flatbuffer dataframes after the existing ones and records them in the catalog
+            with a single catalog write. Does nothing if they don't all fit in the shared memory.
+
+            @param fb_frames: mapping of name to bytes of the Flatbuffer Dataframe.
+        """
+        tot=sum(4+len(x) for x in fb_frames.values())
+        if(not fb_frames or self.start+tot>self.df_shared_memory.size):
             return
-        struct.pack_into('I', self.df_shared_memory.buf, self.start, s)
-        self.df_shared_memory.buf[self.start+4:self.start+4+s]=x
-        self.startdict[name]=self.start
+        start=self.start
+        for name, x in fb_frames.items():
+            s=len(x)
+            struct.pack_into('I', self.df_shared_memory.buf, start, s)
+            self.df_shared_memory.buf[start+4:start+4+s]=x
+            self.startdict[name]=start
+            start+=4+s
         self.start+=tot
-        with open('startdict.json', 'w') as f:
-            json.dump(self.startdict, f)
+        self._write_catalog()
+        if(fb_metrics.enabled()):
+            fb_metrics.count(bytes=tot-4*len(fb_frames), copies=len(fb_frames), copied_bytes=tot-4*len(fb_frames))
+            fb_metrics.gauge(f"segment:{self.df_shared_memory.name}", self.segment_stats())
+
+    def segment_stats(self) -> dict:
+        """
+            Returns the occupancy of the shared memory segment: its size, the bytes held by the
+            dataframes in the catalog (including their size prefixes), the end of the last one,
+            the free bytes after it, and the fraction of the space before it that is unused.
+        """
+        used=0
+        end=0
+        for start in self.startdict.values():
+            tot=4+struct.unpack_from('I', self.df_shared_memory.buf, start)[0]
+            used+=tot
+            end=max(end, start+tot)
+        size=self.df_shared_memory.size
+        return {'size': size, 'frames': len(self.startdict), 'used': used, 'end': end, 'free': size-end,
+                'occupancy': used/size if size else 0.0, 'fragmentation': (end-used)/end if end else 0.0}
 
     def _get_fb_buf(self, df_name: str) -> memoryview:
         """
@@ -55,20 +290,65 @@ class FbSharedMemory:
             return None
         start=self.startdict[df_name]
         size=struct.unpack_from('I', self.df_shared_memory.buf, start)[0]
-        return memoryview(self.df_shared_memory.buf[start+4:start+4+size])
+        fb_buf=memoryview(self.df_shared_memory.buf[start+4:start+4+size])
+        if(fb_dataframe_version(fb_buf) == SUPERSEDED_VERSION and self._refresh_catalog()):
+            # Another process replaced the dataframe: read its replacement instead.
+            return self._get_fb_buf(df_name)
+        return fb_buf
+
+    def _refresh_catalog(self) -> bool:
+        """
+            Re-reads the catalog mirrored in shared memory, e.g. after another process replaced a
+            dataframe. Returns whether it changed.
+        """
+        catalog=self._read_shared_catalog()
+        if(catalog is None or catalog == self.startdict):
+            return False
+        self.startdict=catalog
+        self.start=max(self.start, self.segment_stats()['end'])
+        return True
 
-    def dataframe_head(self, df_name: str, rows: int = 5) -> pd.DataFrame:
+    def _cache_key(self, df_name: str, *query) -> tuple:
+        """
+            Returns the result cache key of a query on the dataframe with df_name: its name, offset
+            and version, which changes whenever the dataframe is modified or replaced, and the query.
+
+            @param df_name: name of the Dataframe.
+            @param query: operation name and parameters.
+        """
+        # Look the dataframe up first, which follows a replacement by another process.
+        version=fb_dataframe_version(self._get_fb_buf(df_name))
+        return (df_name, self.startdict.get(df_name), version) + query
+
+    def cache_stats(self) -> dict:
+        """
+            Returns the size and the hit, miss and eviction counts of the result cache.
+        """
+        return self.cache.stats()
+
+    @fb_metrics.instrumented()
+    def dataframe_head(self, df_name: str, rows: int = 5, raw: bool = False) -> pd.DataFrame:
         """
             Returns the first n rows of the Flatbuffer Dataframe as a Pandas Dataframe
             similar to df.head(). If there are less than n rows, returns the entire Dataframe.
 
             @param df_name: name of the Dataframe.
             @param rows: number of rows to return.
+            @param raw: whether to return a dict of arrays instead, see fb_dataframe_head.
         """
+        key = self._cache_key(df_name, 'head', rows, raw)
+        res = self.cache.get(key)
+        if(res is not None):
+            return res
         fb_bytes = bytes(self._get_fb_buf(df_name))
-        return fb_dataframe_head(fb_bytes, rows)
+        fb_metrics.count(copies=1, copied_bytes=len(fb_bytes))
+        res = fb_dataframe_head(fb_bytes, rows, raw)
+        self.cache.put(key, res)
+        return res
 
-    def dataframe_group_by_sum(self, df_name: str, grouping_col_name: str, sum_col_name: str) -> pd.DataFrame:
+    @fb_metrics.instrumented()
+    def dataframe_group_by_sum(self, df_name: str, grouping_col_name: str, sum_col_name: str,
+                               raw: bool = False) -> pd.DataFrame:
         """
             Applies GROUP BY SUM operation on the flatbuffer dataframe grouping by grouping_col_name
             and summing sum_col_name. Returns the aggregate result as a Pandas dataframe.
@@ -76,27 +356,152 @@ class FbSharedMemory:
             @param df_name: name of the Dataframe.
             @param grouping_col_name: column to group by.
             @param sum_col_name: column to sum.
+            @param raw: whether to return a dict of arrays instead, see fb_dataframe_group_by_sum.
         """
+        key = self._cache_key(df_name, 'group_by_sum', grouping_col_name, sum_col_name, raw)
+        res = self.cache.get(key)
+        if(res is not None):
+            return res
         fb_bytes = bytes(self._get_fb_buf(df_name))
-        return fb_dataframe_group_by_sum(fb_bytes, grouping_col_name, sum_col_name)
+        fb_metrics.count(copies=1, copied_bytes=len(fb_bytes))
+        res = fb_dataframe_group_by_sum(fb_bytes, grouping_col_name, sum_col_name, raw)
+        if(res is not None):
+            self.cache.put(key, res)
+        return res
 
-    def dataframe_map_numeric_column(self, df_name: str, col_name: str, map_func: types.FunctionType) -> None:
+    @fb_metrics.instrumented()
+    def dataframe_sum(self, df_name: str, col_name: str):
+        """
+            Returns the sum of a numeric column in the Flatbuffer Dataframe.
+
+            @param df_name: name of the Dataframe.
+            @param col_name: column to sum.
+        """
+        return fb_dataframe_sum(self._get_fb_buf(df_name), col_name)
+
+    @fb_metrics.instrumented()
+    def dataframe_aggregate(self, df_name: str, col_name: str, agg: str, start: int = 0, stop: int = None):
+        """
+            Returns an aggregate over rows [start, stop) of a column in the Flatbuffer Dataframe,
+            answered from the precomputed column statistics when possible.
+
+            @param df_name: name of the Dataframe.
+            @param col_name: column to aggregate.
+            @param agg: one of 'count', 'null_count', 'distinct_count', 'min', 'max', 'sum', 'mean'.
+            @param start: first row.
+            @param stop: row after the last one, None for the end of the column.
+        """
+        return fb_dataframe_aggregate(self._get_fb_buf(df_name), col_name, agg, start, stop)
+
+    @fb_metrics.instrumented()
+    def dataframe_describe(self, df_name: str, raw: bool = False) -> pd.DataFrame:
+        """
+            Returns summary statistics of every column in the Flatbuffer Dataframe.
+
+            @param df_name: name of the Dataframe.
+            @param raw: whether to return a dict instead, see fb_dataframe_describe.
+        """
+        return fb_dataframe_describe(self._get_fb_buf(df_name), raw)
+
+    @fb_metrics.instrumented()
+    def dataframe_join(self, left_name: str, right_name: str, left_on: str, right_on: str = None,
+                       left_columns: list = None, right_columns: list = None, method: str = 'hash',
+                       raw: bool = False) -> pd.DataFrame:
+        """
+            Inner joins two Flatbuffer Dataframes in place in the shared memory, materializing only
+            the projected columns of the matching rows. See fb_dataframe_join.
+
+            @param left_name: name of the left Dataframe.
+            @param right_name: name of the right Dataframe.
+            @param left_on: key column of the left Dataframe.
+            @param right_on: key column of the right Dataframe, left_on if None.
+            @param left_columns: left columns to return, all of them if None.
+            @param right_columns: right columns to return, all of them if None.
+            @param method: 'hash', or 'merge' if both key columns are sorted.
+            @param raw: whether to return a dict of arrays instead.
+        """
+        left, right = self._get_fb_buf(left_name), self._get_fb_buf(right_name)
+        if(left is None or right is None):
+            return None
+        return fb_dataframe_join(left, right, left_on, right_on, left_columns, right_columns, method, raw=raw)
+
+    @fb_metrics.instrumented()
+    def dataframe_lookup(self, df_name: str, col_name: str, value):
+        """
+            Returns the rows of the Flatbuffer Dataframe where col_name equals value, using the
+            column's index if it has one. See fb_dataframe_lookup.
+
+            @param df_name: name of the Dataframe.
+            @param col_name: column to search.
+            @param value: the value to look for.
+        """
+        return fb_dataframe_lookup(self._get_fb_buf(df_name), col_name, value)
+
+    @fb_metrics.instrumented()
+    def dataframe_range_lookup(self, df_name: str, col_name: str, low=None, high=None):
+        """
+            Returns the rows of the Flatbuffer Dataframe where low <= col_name < high, using the
+            column's sorted index if it has one. See fb_dataframe_range_lookup.
+
+            @param df_name: name of the Dataframe.
+            @param col_name: column to search.
+            @param low: smallest value, or None.
+            @param high: value after the largest one, or None.
+        """
+        return fb_dataframe_range_lookup(self._get_fb_buf(df_name), col_name, low, high)
+
+    @fb_metrics.instrumented()
+    def dataframe_take(self, df_name: str, rows, columns: list = None, raw: bool = False) -> pd.DataFrame:
+        """
+            Returns the given rows of the Flatbuffer Dataframe, e.g. those found by dataframe_lookup.
+
+            @param df_name: name of the Dataframe.
+            @param rows: row indices.
+            @param columns: columns to return, all of them if None.
+            @param raw: whether to return a dict of arrays instead, see fb_dataframe_take.
+        """
+        return fb_dataframe_take(self._get_fb_buf(df_name), rows, columns, raw)
+
+    @fb_metrics.instrumented()
+    def dataframe_map_numeric_column(self, df_name: str, col_name: str, map_func: types.FunctionType,
+                                     refresh_stats: bool = True) -> None:
         """
             Apply map_func to elements in a numeric column in the Flatbuffer Dataframe in place.
+            If the mapped values of a bit-packed or delta column don't fit in its bit width, the
+            mapped frame is published again with replace_dataframe, which marks the old one as
+            superseded for other processes. Raises BitWidthOverflow if it doesn't fit in the
+            shared memory.
 
             @param df_name: name of the Dataframe.
             @param col_name: name of the numeric column to apply map_func to.
             @param map_func: function to apply to elements in the numeric column.
+            @param refresh_stats: whether to recompute the column statistics, or only mark them stale.
         """
-        fb_dataframe_map_numeric_column(self._get_fb_buf(df_name), col_name, map_func)
+        try:
+            fb_dataframe_map_numeric_column(self._get_fb_buf(df_name), col_name, map_func, refresh_stats)
+        except BitWidthOverflow as e:
+            # The mapped values of a bit-packed or delta column need more bits than it is packed
+            # with: publish a copy of the frame holding them with replace_dataframe instead.
+            fb_buf=self._get_fb_buf(df_name)
+            start=self.startdict[df_name]
+            df=fb_dataframe_head(bytes(fb_buf), len(fb_buf))
+            df[col_name]=e.values
+            self.replace_dataframe(df_name, df, **fb_dataframe_layout(fb_buf))
+            if(self.startdict[df_name] == start):
+                raise
+        self.cache.invalidate(df_name)
 
 
     def close(self) -> None:
         """
-            Closes the managed shared memory.
+            Closes the managed shared memory, and unlinks it unless attached with attach().
         """
-        try:
-            self.df_shared_memory.close()
-            self.df_shared_memory.unlink()
-        except:
-            pass
\ No newline at end of file
+        for shm in (self.df_shared_memory, self.catalog_shared_memory):
+            if(shm is None):
+                continue
+            try:
+                shm.close()
+                if(self.owner):
+                    _unlink_segment(shm)
+            except:
+                pass
\ No newline at end of file
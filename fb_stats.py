@@ -0,0 +1,103 @@
+import numpy as np
+
+AGGREGATES = ('count', 'null_count', 'distinct_count', 'min', 'max', 'sum', 'mean')
+
+
+def _valid(values: np.ndarray) -> tuple:
+    """
+        Returns (non-null values, null count) of a column. Only NaN floats count as nulls, as int
+        columns can't hold them and strings are stored as their str().
+
+        @param values: column values.
+    """
+    if(values.dtype.kind == 'f'):
+        nulls = np.isnan(values)
+        null_count = int(np.count_nonzero(nulls))
+        return (values[~nulls] if null_count else values), null_count
+    return values, 0
+
+
+def column_stats(values) -> dict:
+    """
+        Computes the statistics of a column: count, null_count, distinct_count, and for numeric
+        columns min, max and sum over the non-null values (min and max are None if there are none).
+
+        @param values: NumPy array of int64 or float64 values, or list of strings.
+    """
+    if(not isinstance(values, np.ndarray)):
+        return {'count': len(values), 'null_count': 0, 'distinct_count': len(set(values)),
+                'min': None, 'max': None, 'sum': None}
+    valid, null_count = _valid(values)
+    stats = {'count': len(values), 'null_count': null_count, 'distinct_count': len(np.unique(valid)),
+             'min': None, 'max': None, 'sum': valid.sum().item()}
+    if(len(valid)):
+        stats['min'] = valid.min().item()
+        stats['max'] = valid.max().item()
+    return stats
+
+
+def chunk_stats(values, chunk_rows: int) -> list:
+    """
+        Computes the statistics of every chunk_rows rows of a column, as column_stats does but
+        without distinct counts (they can't be combined across chunks).
+
+        @param values: NumPy array of int64 or float64 values, or list of strings.
+        @param chunk_rows: number of rows per chunk.
+    """
+    n = len(values)
+    starts = np.arange(0, n, chunk_rows)
+    counts = np.diff(np.append(starts, n)).tolist()
+    if(not isinstance(values, np.ndarray)):
+        return [{'count': c, 'null_count': 0, 'distinct_count': None, 'min': None, 'max': None, 'sum': None}
+                for c in counts]
+    if(n == 0):
+        return []
+    if(values.dtype.kind == 'f'):
+        nulls = np.isnan(values)
+        null_counts = np.add.reduceat(nulls.astype(np.int64), starts).tolist()
+        sums = np.add.reduceat(np.where(nulls, 0.0, values), starts).tolist()
+        mins = np.fmin.reduceat(values, starts).tolist()
+        maxs = np.fmax.reduceat(values, starts).tolist()
+    else:
+        null_counts = [0] * len(starts)
+        sums = np.add.reduceat(values, starts).tolist()
+        mins = np.minimum.reduceat(values, starts).tolist()
+        maxs = np.maximum.reduceat(values, starts).tolist()
+    chunks = []
+    for c, nc, s, lo, hi in zip(counts, null_counts, sums, mins, maxs):
+        empty = c == nc
+        chunks.append({'count': c, 'null_count': nc, 'distinct_count': None,
+                       'min': None if empty else lo, 'max': None if empty else hi, 'sum': s})
+    return chunks
+
+
+def combine_stats(parts: list) -> dict:
+    """
+        Combines the statistics of consecutive row ranges into the statistics of their union.
+        The distinct count of the union is unknown and set to None.
+
+        @param parts: statistics of the row ranges.
+    """
+    mins = [p['min'] for p in parts if p['min'] is not None]
+    maxs = [p['max'] for p in parts if p['max'] is not None]
+    sums = [p['sum'] for p in parts if p['sum'] is not None]
+    return {'count': sum(p['count'] for p in parts), 'null_count': sum(p['null_count'] for p in parts),
+            'distinct_count': None, 'min': min(mins) if mins else None, 'max': max(maxs) if maxs else None,
+            'sum': sum(sums) if len(sums) == len(parts) else None}
+
+
+def aggregate(stats: dict, agg: str):
+    """
+        Answers an aggregate from column statistics. 'count' counts non-null values like pandas.
+
+        @param stats: column statistics.
+        @param agg: one of AGGREGATES.
+    """
+    if(agg not in AGGREGATES):
+        raise ValueError(f"Unknown aggregate '{agg}', expected one of {AGGREGATES}")
+    non_null = stats['count'] - stats['null_count']
+    if(agg == 'count'):
+        return non_null
+    if(agg == 'mean'):
+        return stats['sum'] / non_null if non_null and stats['sum'] is not None else None
+    return stats[agg]
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import fb_shared_memory
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+
+def test_attach_reads_shared_catalog(tmp_path):
+    df = generate_random_df(50, 1)
+    host = FbSharedMemory(name="test_fb_attach", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        host.add_dataframe("df", df)
+        os.remove(tmp_path / "catalog.json")
+
+        guest = FbSharedMemory.attach("test_fb_attach")
+        head = guest.dataframe_head("df", 10, raw=True)
+        assert np.array_equal(head["int_col"], df["int_col"][:10].to_numpy())
+        assert head["string_col"] == df["string_col"][:10].tolist()
+
+        expected = df.groupby("int_col").agg({"additional_col_0": "sum"})
+        res = guest.dataframe_group_by_sum("df", "int_col", "additional_col_0", raw=True)
+        assert np.array_equal(res["int_col"], expected.index.to_numpy())
+        assert np.array_equal(res["additional_col_0"], expected["additional_col_0"].to_numpy())
+
+        # Frames published later are seen by guests attaching later.
+        host.add_dataframe("df2", df)
+        assert set(FbSharedMemory.attach("test_fb_attach").startdict) == {"df", "df2"}
+    finally:
+        host.close()
+
+
+def test_attach_does_not_import_pandas(tmp_path):
+    host = FbSharedMemory(name="test_fb_attach_lazy", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        host.add_dataframe("df", generate_random_df(20, 1))
+        code = ("import sys; from fb_shared_memory import FbSharedMemory; "
+                "guest = FbSharedMemory.attach('test_fb_attach_lazy'); "
+                "guest.dataframe_head('df', raw=True); guest.dataframe_group_by_sum('df', 'int_col', 'additional_col_0', raw=True); "
+                "guest.dataframe_describe('df', raw=True); "
+                "print('pandas' in sys.modules, 'concurrent.futures' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        assert out.stdout.strip() == "False False"
+    finally:
+        host.close()
+
+
+def test_guest_processes_leave_segments_attached(tmp_path):
+    host = FbSharedMemory(name="test_fb_attach_guests", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        host.add_dataframe("df", generate_random_df(20, 1))
+        code = ("from fb_shared_memory import FbSharedMemory; "
+                "guest = FbSharedMemory.attach('test_fb_attach_guests'); "
+                "print(sorted(guest.startdict)); guest.close()")
+        for _ in range(2):
+            out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+            assert out.returncode == 0, out.stderr
+            assert out.stdout.strip() == "['df']"
+        assert list(FbSharedMemory.attach("test_fb_attach_guests").startdict) == ["df"]
+    finally:
+        host.close()
+
+
+def test_partially_written_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(fb_shared_memory, "CATALOG_RETRIES", 3)
+    host = FbSharedMemory(name="test_fb_attach_torn", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        host.add_dataframe("df", generate_random_df(20, 1))
+        # A writer died between marking the catalog as being written and finishing it.
+        seq, n = fb_shared_memory.CATALOG_HEADER.unpack_from(host.catalog_shared_memory.buf, 0)
+        fb_shared_memory.CATALOG_HEADER.pack_into(host.catalog_shared_memory.buf, 0, seq + 1, n)
+
+        with pytest.raises(TimeoutError):
+            FbSharedMemory.attach("test_fb_attach_torn")
+        assert list(FbSharedMemory(name="test_fb_attach_torn", catalog_path=str(tmp_path / "catalog.json")).startdict) == ["df"]
+
+        host.add_dataframe("df2", generate_random_df(20, 1))
+        assert list(FbSharedMemory.attach("test_fb_attach_torn").startdict) == ["df", "df2"]
+    finally:
+        host.close()
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from fb_dataframe import to_flatbuffer
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_add_dataframes_commits_catalog_once(tmp_path, max_workers):
+    frames = {f"df{i}": generate_random_df(50, 1) for i in range(6)}
+    catalog_path = str(tmp_path / "catalog.json")
+    fb_shm = FbSharedMemory(name="test_fb_batch", size=1000000, catalog_path=catalog_path)
+    try:
+        fb_shm.add_dataframe("df0", frames["df0"])
+        writes = []
+        write_catalog = fb_shm._write_catalog
+        fb_shm._write_catalog = lambda: writes.append(1) or write_catalog()
+
+        fb_shm.add_dataframes(frames, indexes={"int_col": "sorted"}, max_workers=max_workers)
+        assert len(writes) == 1
+        with open(catalog_path) as f:
+            assert set(json.load(f)) == set(frames)
+
+        guest = FbSharedMemory.attach("test_fb_batch")
+        for name, df in frames.items():
+            assert guest.dataframe_head(name, 50).equals(df)
+        assert guest.dataframe_lookup("df3", "int_col", 4).tolist() == frames["df3"].index[frames["df3"]["int_col"] == 4].tolist()
+    finally:
+        fb_shm.close()
+
+
+def test_add_dataframes_is_all_or_nothing(tmp_path):
+    frames = {f"df{i}": generate_random_df(50, 1) for i in range(3)}
+    size = 4 + len(to_flatbuffer(frames["df0"])) + 100
+    fb_shm = FbSharedMemory(name="test_fb_batch_full", size=size, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        fb_shm.add_dataframes(frames, max_workers=1)
+        assert fb_shm.startdict == {}
+        assert fb_shm.segment_stats()['end'] == 0
+    finally:
+        fb_shm.close()
@@ -0,0 +1,26 @@
+from fb_benchmark import OPERATIONS, _FbPath, generate_bench_df, run_case
+
+
+def test_run_case_reports_every_path_and_operation(tmp_path):
+    case = {'rows': 50, 'int_cols': 2, 'float_cols': 1, 'string_cols': 1, 'string_len': 5}
+
+    results = run_case(case, repeat=2, warmup=0, paths=('fb', 'pickle5'), catalog_dir=str(tmp_path))
+
+    assert [(r['path'], r['op']) for r in results] == [(p, op) for p in ('fb', 'pickle5') for op in OPERATIONS]
+    for r in results:
+        assert r['repeat'] == 2
+        assert 0 < r['min_s'] <= r['p50_s'] <= r['p99_s'] <= r['max_s']
+        assert r['serialized_bytes'] > 0 and r['max_rss_bytes'] > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fb_path_queries_bypass_result_cache(tmp_path):
+    path = _FbPath(generate_bench_df(50, 2, 0, 0, 5), str(tmp_path))
+    path.setup()
+    try:
+        for _ in range(3):
+            path.head()
+            path.group_by()
+        assert path.fb_shm.cache_stats()['hits'] == 0
+    finally:
+        path.teardown()
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from fb_cache import ResultCache
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+
+def test_result_cache_evicts_least_recently_used():
+    results = [pd.DataFrame({"a": range(100)}) for _ in range(3)]
+    nbytes = int(results[0].memory_usage(index=True, deep=True).sum())
+    cache = ResultCache(2 * nbytes)
+
+    cache.put(("df", 0), results[0])
+    cache.put(("df", 1), results[1])
+    assert cache.get(("df", 0)).equals(results[0])
+    cache.put(("df", 2), results[2])
+
+    assert cache.get(("df", 1)) is None
+    assert cache.stats() == {'entries': 2, 'bytes': 2 * nbytes, 'max_bytes': 2 * nbytes,
+                             'hits': 1, 'misses': 1, 'evictions': 1}
+    cache.invalidate("df")
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_cached_queries_follow_frame_version(tmp_path):
+    df = generate_random_df(20, 2)
+    fb_shm = FbSharedMemory(name="test_fb_cache", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        fb_shm.add_dataframe("df", df)
+        head = fb_shm.dataframe_head("df", 20)
+        head["int_col"] = -1
+        assert fb_shm.dataframe_head("df", 20).equals(df)
+        assert fb_shm.dataframe_group_by_sum("df", "int_col", "additional_col_0") is not None
+        assert fb_shm.dataframe_group_by_sum("df", "int_col", "additional_col_0") is not None
+        assert fb_shm.cache_stats()['hits'] == 2
+
+        # A map from another process bumps the version stored in the frame.
+        guest = FbSharedMemory(name="test_fb_cache", catalog_path=str(tmp_path / "catalog.json"))
+        guest.dataframe_map_numeric_column("df", "int_col", lambda x: x + 1)
+        guest.df_shared_memory.close()
+        df["int_col"] = df["int_col"] + 1
+        assert fb_shm.dataframe_head("df", 20).equals(df)
+
+        df2 = generate_random_df(5, 1)
+        fb_shm.replace_dataframe("df", df2)
+        assert fb_shm.dataframe_head("df", 20).equals(df2)
+        assert fb_shm.segment_stats()['fragmentation'] > 0
+    finally:
+        fb_shm.close()
+
+
+def test_replaced_frames_are_followed_by_other_instances(tmp_path):
+    df = generate_random_df(20, 2)
+    fb_shm = FbSharedMemory(name="test_fb_cache_replace", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        fb_shm.add_dataframe("df", df)
+        guest = FbSharedMemory(name="test_fb_cache_replace", catalog_path=str(tmp_path / "catalog.json"))
+        assert guest.dataframe_head("df", 20).equals(df)
+
+        # A replacement by another process marks the old frame, so cached results and data are re-read.
+        df2 = generate_random_df(10, 1)
+        fb_shm.replace_dataframe("df", df2)
+        assert guest.dataframe_head("df", 20).equals(df2)
+        assert guest.dataframe_sum("df", "int_col") == df2["int_col"].sum()
+        assert guest.startdict == fb_shm.startdict
+        guest.df_shared_memory.close()
+        guest.catalog_shared_memory.close()
+    finally:
+        fb_shm.close()
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from fb_dataframe import to_flatbuffer, fb_dataframe_head, fb_dataframe_group_by_sum, fb_dataframe_map_numeric_column, \
+    fb_dataframe_sum, BitWidthOverflow
+from fb_shared_memory import FbSharedMemory
+from fb_encoding import decode_bitpack, decode_delta, decode_rle, encode_bitpack, encode_delta, encode_rle
+from test_fb_dataframe import generate_random_df
+
+
+ENCODINGS = ['plain', 'rle', 'delta', 'bitpack', 'auto']
+
+
+def test_encoding_kernels_round_trip():
+    values = np.array([5, 5, 5, -3, 1000, 1000, 7, 2 ** 40, -2 ** 40], dtype=np.int64)
+
+    assert np.array_equal(decode_rle(*encode_rle(values)), values)
+    assert np.array_equal(decode_rle(*encode_rle(values), rows=4), values[:4])
+
+    base, width, packed = encode_bitpack(values)
+    assert np.array_equal(decode_bitpack(packed, base, width, len(values)), values)
+
+    first, base, width, packed = encode_delta(values)
+    assert np.array_equal(decode_delta(packed, first, base, width, len(values)), values)
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_encoded_columns_match_pandas(encoding):
+    df = generate_random_df(200, 3)
+    df["sorted_col"] = sorted(df["additional_col_0"])
+    encodings = {c: encoding for c in df.columns}
+
+    fb_df = to_flatbuffer(df, encodings)
+
+    assert fb_dataframe_head(fb_df, len(df)).equals(df)
+    assert fb_dataframe_head(fb_df, 7).equals(df.head(7))
+    for grouping_col in ["int_col", "sorted_col"]:
+        expected = df.groupby(grouping_col).agg({'additional_col_1': 'sum'})
+        assert fb_dataframe_group_by_sum(fb_df, grouping_col, "additional_col_1").equals(expected)
+    assert fb_dataframe_sum(fb_df, "sorted_col") == df["sorted_col"].sum()
+    assert fb_dataframe_sum(fb_df, "string_col") is None
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_encoded_columns_map_in_place(encoding):
+    df = generate_random_df(50, 1)
+    fb_df = to_flatbuffer(df, {"int_col": encoding})
+
+    fb_dataframe_map_numeric_column(fb_df, "int_col", lambda x: 10 - x)
+
+    df["int_col"] = df["int_col"].apply(lambda x: 10 - x)
+    assert fb_dataframe_head(fb_df, len(df)).equals(df)
+
+
+@pytest.mark.parametrize("encoding", ['delta', 'bitpack'])
+def test_map_overflowing_bit_width(tmp_path, encoding):
+    df = generate_random_df(50, 1)
+    fb_df = to_flatbuffer(df, {"int_col": encoding, "additional_col_0": "rle"}, indexes={"int_col": "hash"})
+    before = bytes(fb_df)
+
+    # In place, the frame is left untouched.
+    with pytest.raises(BitWidthOverflow):
+        fb_dataframe_map_numeric_column(fb_df, "int_col", lambda x: x * 1000)
+    assert bytes(fb_df) == before
+
+    # In shared memory, the frame is published again with the same layout, mapping each value once.
+    fb_shm = FbSharedMemory(name="test_fb_encoding", size=100000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        fb_shm.add_dataframe("df", df, {"int_col": encoding, "additional_col_0": "rle"}, {"int_col": "hash"})
+        guest = FbSharedMemory(name="test_fb_encoding", catalog_path=str(tmp_path / "catalog.json"))
+        assert guest.dataframe_head("df", len(df)).equals(df)
+        calls = []
+        fb_shm.dataframe_map_numeric_column("df", "int_col", lambda x: calls.append(x) or x * 1000)
+        assert len(calls) == len(df)
+        df["int_col"] = df["int_col"] * 1000
+        assert fb_shm.dataframe_head("df", len(df)).equals(df)
+        assert fb_shm.dataframe_lookup("df", "int_col", 5000).tolist() == df.index[df["int_col"] == 5000].tolist()
+        # Instances that attached earlier follow the copy too.
+        assert guest.dataframe_head("df", len(df)).equals(df)
+
+        # Errors raised by map_func itself propagate without publishing a copy.
+        start = fb_shm.startdict["df"]
+        with pytest.raises(ValueError, match="bad value"):
+            fb_shm.dataframe_map_numeric_column("df", "int_col", lambda x: int("bad value"))
+        assert fb_shm.startdict["df"] == start
+        guest.df_shared_memory.close()
+        guest.catalog_shared_memory.close()
+    finally:
+        fb_shm.close()
+
+    # Raises if the frame doesn't fit in the shared memory again.
+    fb_shm = FbSharedMemory(name="test_fb_encoding_full", size=4 + len(before), catalog_path=str(tmp_path / "full.json"))
+    try:
+        fb_shm.add_dataframe("df", df, {"int_col": encoding})
+        with pytest.raises(BitWidthOverflow):
+            fb_shm.dataframe_map_numeric_column("df", "int_col", lambda x: x * 1000)
+    finally:
+        fb_shm.close()
+
+
+@pytest.mark.parametrize("stats", [True, False])
+def test_bitpacked_sum_wraps_like_plain(stats):
+    df = generate_random_df(9, 1)
+    df["int_col"] = [2 ** 62] * 4 + [-2 ** 62] * 4 + [5]
+    for encoding in ['plain', 'bitpack']:
+        assert fb_dataframe_sum(to_flatbuffer(df, {"int_col": encoding}, stats=stats), "int_col") == 5
+
+
+def test_encodings_shrink_small_int_columns():
+    df = generate_random_df(1000, 10)
+
+    plain = to_flatbuffer(df)
+    packed = to_flatbuffer(df, {c: 'auto' for c in df.columns})
+
+    assert len(packed) * 2 < len(plain)
+    with pytest.raises(ValueError):
+        to_flatbuffer(df, {"int_col": "zstd"})
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from fb_dataframe import to_flatbuffer, fb_dataframe_lookup, fb_dataframe_range_lookup, fb_dataframe_map_numeric_column
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+
+@pytest.mark.parametrize("index", ['sorted', 'hash'])
+@pytest.mark.parametrize("encoding", ['plain', 'bitpack', 'rle'])
+def test_lookups_match_scan(index, encoding):
+    df = generate_random_df(2000, 1)
+    fb_df = to_flatbuffer(df, {"int_col": encoding}, indexes={c: index for c in ["int_col", "float_col", "string_col"]})
+
+    for col in ["int_col", "float_col", "string_col"]:
+        for value in list(df[col][:5]) + [df[col].max()]:
+            assert np.array_equal(fb_dataframe_lookup(fb_df, col, value), np.flatnonzero(df[col] == value))
+    assert len(fb_dataframe_lookup(fb_df, "string_col", "missing")) == 0
+    for low, high in [(2, 5), (None, 3), (7, None), (5, 2)]:
+        expected = np.flatnonzero((df["int_col"] >= (low if low is not None else -1)) & (df["int_col"] < (high if high is not None else 11)))
+        assert np.array_equal(fb_dataframe_range_lookup(fb_df, "int_col", low, high), expected)
+    assert np.array_equal(fb_dataframe_range_lookup(fb_df, "string_col", "C", "K"),
+                          np.flatnonzero((df["string_col"] >= "C") & (df["string_col"] < "K")))
+    assert fb_dataframe_lookup(fb_df, "missing_col", 1) is None
+
+    # The index is rebuilt in place when the column is modified.
+    fb_dataframe_map_numeric_column(fb_df, "int_col", lambda x: 10 - x)
+    assert np.array_equal(fb_dataframe_lookup(fb_df, "int_col", 8), np.flatnonzero(df["int_col"] == 2))
+    with pytest.raises(ValueError):
+        to_flatbuffer(df, indexes={"int_col": "btree"})
+
+
+def test_sorted_column_lookups(tmp_path):
+    df = generate_random_df(1000, 1).sort_values("additional_col_0", ignore_index=True)
+    fb_shm = FbSharedMemory(name="test_fb_index", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        fb_shm.add_dataframe("df", df, indexes={"additional_col_0": "sorted"})
+        rows = fb_shm.dataframe_range_lookup("df", "additional_col_0", 100, 200)
+        assert np.array_equal(rows, np.arange(rows[0], rows[-1] + 1))
+        assert np.array_equal(rows, np.flatnonzero((df["additional_col_0"] >= 100) & (df["additional_col_0"] < 200)))
+
+        value = df["additional_col_0"][500]
+        res = fb_shm.dataframe_take("df", fb_shm.dataframe_lookup("df", "additional_col_0", value), ["string_col"])
+        assert res["string_col"].tolist() == df["string_col"][df["additional_col_0"] == value].tolist()
+
+        # An index without permutation is stale once the column is no longer sorted, and lookups scan.
+        fb_shm.dataframe_map_numeric_column("df", "additional_col_0", lambda x: -x)
+        assert np.array_equal(fb_shm.dataframe_lookup("df", "additional_col_0", -value),
+                              np.flatnonzero(df["additional_col_0"] == value))
+    finally:
+        fb_shm.close()
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from fb_dataframe import to_flatbuffer, fb_dataframe_join
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+
+def expected_join(left, right, on):
+    # pandas.merge orders inner join rows by left row and then right row only since pandas 2.2.
+    res = pd.merge(left.reset_index(), right.reset_index(), on=on)
+    return res.sort_values(["index_x", "index_y"]).drop(columns=["index_x", "index_y"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("left_rows, right_rows", [(2000, 150), (150, 2000)])
+def test_hash_join_matches_pandas_merge(left_rows, right_rows):
+    left = generate_random_df(left_rows, 2)
+    right = generate_random_df(right_rows, 1)
+    fb_left = to_flatbuffer(left, {"int_col": "bitpack"})
+    fb_right = to_flatbuffer(right)
+
+    res = fb_dataframe_join(fb_left, fb_right, "int_col", batch_rows=64)
+    assert res.equals(expected_join(left, right, "int_col"))
+
+    res = fb_dataframe_join(fb_left, fb_right, "int_col", left_columns=["float_col"], right_columns=["string_col"], raw=True)
+    expected = expected_join(left[["int_col", "float_col"]], right[["int_col", "string_col"]], "int_col")
+    assert res["float_col"].tolist() == expected["float_col"].tolist()
+    assert res["string_col"] == expected["string_col"].tolist()
+
+    assert fb_dataframe_join(fb_left, fb_right, "int_col", right_columns=["missing_col"]) is None
+    with pytest.raises(ValueError):
+        fb_dataframe_join(fb_left, fb_right, "int_col", right_on="string_col")
+
+
+def test_merge_join_on_sorted_keys(tmp_path):
+    left = generate_random_df(1000, 1).sort_values("int_col", ignore_index=True)
+    right = generate_random_df(300, 1).sort_values("int_col", ignore_index=True)
+    fb_shm = FbSharedMemory(name="test_fb_join", size=1000000, catalog_path=str(tmp_path / "catalog.json"))
+    try:
+        fb_shm.add_dataframe("left", left)
+        fb_shm.add_dataframe("right", right)
+        expected = pd.merge(left, right, on="int_col")
+        assert fb_shm.dataframe_join("left", "right", "int_col", method="merge").equals(expected)
+        assert fb_shm.dataframe_join("left", "right", "int_col").equals(expected)
+        with pytest.raises(ValueError):
+            fb_shm.dataframe_join("left", "right", "float_col", method="merge")
+        assert fb_shm.dataframe_join("left", "missing", "int_col") is None
+    finally:
+        fb_shm.close()
+
+
+@pytest.mark.parametrize("left_rows, right_rows", [(0, 10), (10, 0), (1, 1), (500, 500)])
+def test_merge_join_edge_cases(left_rows, right_rows):
+    left = generate_random_df(left_rows, 1).sort_values("int_col", ignore_index=True)
+    right = generate_random_df(right_rows, 1).sort_values("int_col", ignore_index=True)
+
+    res = fb_dataframe_join(to_flatbuffer(left), to_flatbuffer(right), "int_col", method="merge", raw=True)
+    expected = pd.merge(left, right, on="int_col")
+    assert res["int_col"].tolist() == expected["int_col"].tolist()
+    assert res["additional_col_0_x"].tolist() == expected["additional_col_0_x"].tolist()
+    assert list(res["string_col_y"]) == expected["string_col_y"].tolist()
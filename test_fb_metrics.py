@@ -0,0 +1,56 @@
+import fb_metrics
+
+from fb_dataframe import to_flatbuffer, fb_dataframe_head, fb_dataframe_map_numeric_column
+from fb_shared_memory import FbSharedMemory
+from test_fb_dataframe import generate_random_df
+
+
+def test_metrics_disabled_by_default():
+    fb_metrics.reset()
+    fb_dataframe_head(to_flatbuffer(generate_random_df(10, 1)))
+
+    assert fb_metrics.snapshot() == {'enabled': False, 'operations': {}, 'gauges': {}}
+
+
+def test_metrics_record_operations_and_callbacks():
+    df = generate_random_df(100, 2)
+    events = []
+    fb_metrics.reset()
+    fb_metrics.enable()
+    callback = fb_metrics.register_callback(events.append)
+    try:
+        fb_df = to_flatbuffer(df)
+        fb_dataframe_head(fb_df, 3)
+        fb_dataframe_map_numeric_column(fb_df, "int_col", lambda x: x + 1)
+    finally:
+        fb_metrics.unregister_callback(callback)
+        fb_metrics.disable()
+
+    assert [e['op'] for e in events] == ['to_flatbuffer', 'fb_dataframe_head', 'fb_dataframe_map_numeric_column']
+    assert events[0]['rows'] == 100 and events[0]['columns'] == 5 and events[0]['bytes'] == len(fb_df)
+    assert events[1]['rows'] == 3
+    assert events[2]['copies'] == 2 and events[2]['copied_bytes'] == 2 * len(fb_df)
+    operations = fb_metrics.snapshot()['operations']
+    assert operations['fb_dataframe_head']['calls'] == 1
+    assert operations['fb_dataframe_head']['seconds'] == events[1]['seconds'] > 0
+
+
+def test_segment_occupancy_gauge(tmp_path):
+    df = generate_random_df(10, 1)
+    fb_shm = FbSharedMemory(name="test_fb_metrics", size=100000, catalog_path=str(tmp_path / "catalog.json"))
+    fb_metrics.reset()
+    fb_metrics.enable()
+    try:
+        fb_shm.add_dataframe("df1", df)
+        fb_shm.add_dataframe("df2", df)
+        fb_shm.dataframe_head("df1")
+    finally:
+        fb_metrics.disable()
+        fb_shm.close()
+
+    snapshot = fb_metrics.snapshot()
+    segment = snapshot['gauges']['segment:test_fb_metrics']
+    assert segment['frames'] == 2 and segment['end'] == segment['used'] and segment['fragmentation'] == 0.0
+    assert segment['free'] == 100000 - segment['used']
+    assert snapshot['operations']['FbSharedMemory.add_dataframe']['calls'] == 2
+    assert snapshot['operations']['FbSharedMemory.dataframe_head']['copies'] == 1
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from fb_dataframe import to_flatbuffer, fb_dataframe_aggregate, fb_dataframe_describe, fb_dataframe_map_numeric_column
+from test_fb_dataframe import generate_random_df
+
+
+def expected_aggregate(series, agg):
+    if(agg == 'null_count'):
+        return int(series.isna().sum())
+    if(agg == 'distinct_count'):
+        return series.nunique()
+    return getattr(series, agg)()
+
+
+@pytest.mark.parametrize("encoding", ['plain', 'bitpack'])
+def test_aggregates_match_pandas(encoding):
+    df = generate_random_df(1000, 2)
+    df.loc[3, "float_col"] = np.nan
+    fb_df = to_flatbuffer(df, {"int_col": encoding}, chunk_rows=128)
+
+    for col in ["int_col", "float_col", "additional_col_1"]:
+        for agg in ['count', 'null_count', 'distinct_count', 'min', 'max', 'sum', 'mean']:
+            assert fb_dataframe_aggregate(fb_df, col, agg) == pytest.approx(expected_aggregate(df[col], agg))
+        for start, stop in [(0, 1000), (5, 900), (128, 256), (300, 310)]:
+            for agg in ['count', 'min', 'max', 'sum']:
+                expected = expected_aggregate(df[col][start:stop], agg)
+                assert fb_dataframe_aggregate(fb_df, col, agg, start, stop) == pytest.approx(expected)
+
+    assert fb_dataframe_aggregate(fb_df, "string_col", "count") == 1000
+    assert fb_dataframe_aggregate(fb_df, "string_col", "sum") is None
+    assert fb_dataframe_aggregate(fb_df, "missing_col", "sum") is None
+    with pytest.raises(ValueError):
+        fb_dataframe_aggregate(fb_df, "int_col", "median")
+
+
+def test_describe():
+    df = generate_random_df(100, 1)
+    summary = fb_dataframe_describe(to_flatbuffer(df))
+
+    assert list(summary.columns) == list(df.columns)
+    assert summary["int_col"]["max"] == df["int_col"].max()
+    assert summary["float_col"]["mean"] == pytest.approx(df["float_col"].mean())
+    assert summary["string_col"]["distinct_count"] == df["string_col"].nunique()
+
+
+def test_single_chunk_columns_have_no_chunk_stats():
+    df = generate_random_df(100, 1)
+    fb_df = to_flatbuffer(df, chunk_rows=100)
+
+    assert len(fb_df) < len(to_flatbuffer(df, chunk_rows=99))
+    assert fb_dataframe_aggregate(fb_df, "int_col", "sum") == df["int_col"].sum()
+    assert fb_dataframe_aggregate(fb_df, "int_col", "max", 10, 90) == df["int_col"][10:90].max()
+
+
+@pytest.mark.parametrize("chunk_rows", [100, 300])
+def test_map_refreshes_or_marks_stats_stale(chunk_rows):
+    df = generate_random_df(300, 1)
+    fb_df = to_flatbuffer(df, chunk_rows=chunk_rows)
+
+    fb_dataframe_map_numeric_column(fb_df, "int_col", lambda x: x * 3)
+    df["int_col"] = df["int_col"] * 3
+    assert fb_dataframe_aggregate(fb_df, "int_col", "sum") == df["int_col"].sum()
+    assert fb_dataframe_aggregate(fb_df, "int_col", "max", 100, 200) == df["int_col"][100:200].max()
+
+    # Stale statistics fall back to scanning the column.
+    fb_dataframe_map_numeric_column(fb_df, "float_col", lambda x: -x, refresh_stats=False)
+    assert fb_dataframe_aggregate(fb_df, "float_col", "max") == pytest.approx(-df["float_col"].min())
+    assert fb_dataframe_aggregate(fb_df, "float_col", "min", 100, 200) == pytest.approx(-df["float_col"][100:200].max())